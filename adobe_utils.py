@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 
 import os
+import time
 import logging
 import json
 from adobe.pdfservices.operation.auth.service_principal_credentials import ServicePrincipalCredentials
@@ -13,12 +14,37 @@ from adobe.pdfservices.operation.pdfjobs.jobs.export_pdf_job import ExportPDFJob
 from adobe.pdfservices.operation.pdfjobs.params.export_pdf.export_pdf_params import ExportPDFParams
 from adobe.pdfservices.operation.pdfjobs.params.export_pdf.export_pdf_target_format import ExportPDFTargetFormat
 from adobe.pdfservices.operation.pdfjobs.result.export_pdf_result import ExportPDFResult
+import metrics
+from circuit_breaker import CircuitBreaker
 
 # Set up logging
 logger = logging.getLogger('adobe_pdf_services')
 
 # Path to credentials file
 CREDENTIALS_FILE = '/app/config/pdfservices-api-credentials.json'
+# Stop calling Adobe after this many service failures in a row, for
+# ADOBE_RESET_SECONDS, so requests fail fast instead of waiting on a dead API
+ADOBE_FAILURE_THRESHOLD = int(os.environ.get('ADOBE_FAILURE_THRESHOLD', '3'))
+ADOBE_RESET_SECONDS = int(os.environ.get('ADOBE_RESET_SECONDS', '300'))
+# Conversions slower than this count as a timeout even if they succeed
+ADOBE_SLOW_CALL_SECONDS = int(os.environ.get('ADOBE_SLOW_CALL_SECONDS', '180'))
+
+ADOBE_BREAKER = CircuitBreaker('adobe', ADOBE_FAILURE_THRESHOLD, ADOBE_RESET_SECONDS)
+
+class ServiceUnavailable(Exception):
+    """Raised without contacting Adobe while the circuit breaker is open."""
+
+def is_service_failure(error):
+    """
+    Tell outages apart from problems with the document itself.
+
+    Client errors such as an unreadable PDF don't say anything about the
+    health of the service, so they don't count towards opening the circuit.
+    """
+    if isinstance(error, ServiceApiException):
+        status = error.status_code
+        return not (400 <= status < 500) or status in (408, 429)
+    return True
 
 def convert_pdf_to_excel(pdf_path, excel_path):
     """
@@ -30,7 +56,14 @@ def convert_pdf_to_excel(pdf_path, excel_path):
         
     Returns:
         bool: True if conversion was successful, False otherwise
+        
+    Raises:
+        ServiceUnavailable: If the circuit breaker is open
     """
+    if not ADOBE_BREAKER.allow():
+        raise ServiceUnavailable("Adobe PDF Services is unavailable, conversion deferred")
+    
+    start = time.monotonic()
     try:
         # Read PDF content
         with open(pdf_path, 'rb') as file:
@@ -50,10 +83,11 @@ def convert_pdf_to_excel(pdf_path, excel_path):
         pdf_services = PDFServices(credentials=credentials)
         
         # Create asset from source file and upload
-        input_asset = pdf_services.upload(
-            input_stream=input_stream, 
-            mime_type=PDFServicesMediaType.PDF
-        )
+        with metrics.timed(metrics.ADOBE_PHASE_DURATION, phase='upload'):
+            input_asset = pdf_services.upload(
+                input_stream=input_stream, 
+                mime_type=PDFServicesMediaType.PDF
+            )
         
         # Create parameters for Excel export
         export_pdf_params = ExportPDFParams(target_format=ExportPDFTargetFormat.XLSX)
@@ -65,23 +99,36 @@ def convert_pdf_to_excel(pdf_path, excel_path):
         )
         
         # Submit the job and get the result
-        location = pdf_services.submit(export_pdf_job)
-        pdf_services_response = pdf_services.get_job_result(location, ExportPDFResult)
+        with metrics.timed(metrics.ADOBE_PHASE_DURATION, phase='submit'):
+            location = pdf_services.submit(export_pdf_job)
+        with metrics.timed(metrics.ADOBE_PHASE_DURATION, phase='poll'):
+            pdf_services_response = pdf_services.get_job_result(location, ExportPDFResult)
         
         # Get content from the resulting asset
         result_asset = pdf_services_response.get_result().get_asset()
-        stream_asset = pdf_services.get_content(result_asset)
-        
-        # Save the result to Excel file
-        with open(excel_path, "wb") as file:
-            file.write(stream_asset.get_input_stream())
+        with metrics.timed(metrics.ADOBE_PHASE_DURATION, phase='download'):
+            stream_asset = pdf_services.get_content(result_asset)
+            
+            # Save the result to Excel file
+            with open(excel_path, "wb") as file:
+                file.write(stream_asset.get_input_stream())
             
         logger.info(f"Successfully converted PDF to Excel: {excel_path}")
+        
+        elapsed = time.monotonic() - start
+        if elapsed > ADOBE_SLOW_CALL_SECONDS:
+            logger.warning(f"Adobe conversion took {elapsed:.0f}s, counting it as a timeout")
+            ADOBE_BREAKER.record_failure()
+        else:
+            ADOBE_BREAKER.record_success()
         return True
         
     except (ServiceApiException, ServiceUsageException, SdkException) as e:
         logger.error(f"Adobe API error: {e}")
+        if is_service_failure(e):
+            ADOBE_BREAKER.record_failure()
         return False
     except Exception as e:
         logger.error(f"Unexpected error in PDF to Excel conversion: {e}")
+        ADOBE_BREAKER.record_failure()
         return False
\ No newline at end of file
@@ -1,28 +1,34 @@
 #!/usr/bin/env python3
 
 import os
+import io
 import sqlite3
 import datetime
 import logging
 import sys
-import json
-from flask import Flask, render_template, send_from_directory, jsonify, request, Response, redirect, url_for
-from apscheduler.schedulers.background import BackgroundScheduler
-import scraper
-import openpyxl
-from openpyxl.styles import Font, Alignment, Border, Side
-import re
-import tempfile
-import locale
-import adobe_utils
-import excel_formatter
-
-# Set up logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[logging.FileHandler('/app/logs/app.log'), logging.StreamHandler(sys.stdout)]
-)
+import time
+import hmac
+import threading
+import hashlib
+import mimetypes
+import functools
+from contextlib import ExitStack
+from flask import Flask, Blueprint, render_template, send_file, send_from_directory, jsonify, request, Response, make_response, redirect, url_for, abort, g
+from werkzeug.http import is_resource_modified
+from werkzeug.security import safe_join
+import archive
+import data_version
+import database
+import file_reaper
+import metrics
+import previews
+import profiling
+import search_index
+import tasks
+
+# Heavy modules (converter pulls in the Adobe SDK and openpyxl) are imported
+# inside the routes that need them, so workers boot and answer /health quickly.
+
 logger = logging.getLogger('acea_webapp')
 
 # Constants
@@ -30,85 +36,201 @@ DB_PATH = '/app/data/database.db'
 PDF_DIR = '/app/data/pdfs'
 EXCEL_DIR = '/app/data/excel'
 LOG_FILE = '/app/logs/scraper.log'
+APP_LOG_FILE = '/app/logs/app.log'
 CONVERSION_LOG = '/app/logs/conversion.log'
+DATA_DIR = '/app/data'
+TEMPLATE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), 'templates'))
 
-# Ensure directories exist
-os.makedirs(PDF_DIR, exist_ok=True)
-os.makedirs(EXCEL_DIR, exist_ok=True)
+# File downloads: 'x-sendfile' (Apache/lighttpd) or 'x-accel-redirect' (nginx)
+# hands the transfer to the front proxy; anything else streams from gunicorn.
+FILE_OFFLOAD = os.environ.get('FILE_OFFLOAD', '').lower()
+# Internal nginx location that maps to DATA_DIR, used with x-accel-redirect
+X_ACCEL_PREFIX = os.environ.get('X_ACCEL_PREFIX', '/protected')
+# Published PDFs never change; workbooks can be regenerated and are revalidated
+PDF_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+EXCEL_CACHE_CONTROL = 'no-cache'
+# Dashboard, listings and stats are revalidated against the data version
+PAGE_CACHE_CONTROL = 'no-cache'
+# Settings for the connections each worker thread keeps open
+DB_BUSY_TIMEOUT = 10  # seconds to wait for the scheduler's write lock
+DB_CACHED_STATEMENTS = 256
+DB_MMAP_SIZE = 64 * 1024 * 1024
+DB_CACHE_KIB = 8192
 
-# Get the absolute path to the templates directory
-template_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), 'templates'))
-logger.info(f"Template directory path: {template_dir}")
+bp = Blueprint('main', __name__)
 
-# List files in the templates directory to verify
-try:
-    template_files = os.listdir(template_dir)
-    logger.info(f"Template files found: {template_files}")
-except Exception as e:
-    logger.error(f"Error listing template files: {e}")
-    template_files = []
+# path -> (mtime_ns, size, etag), so each file is hashed once per version
+_etag_cache = {}
 
-# Create Flask app with explicit template folder
-app = Flask(__name__, template_folder=template_dir)
+# ('ro' | 'rw', DB_PATH) -> connection, kept per worker thread
+_thread_connections = threading.local()
 
-def get_db_connection():
-    """Create a database connection."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+# request path -> (etag, body, content_type) of the last rendered version
+_page_cache = {}
+
+def create_app():
+    """
+    Create the Flask app.
+    
+    All start-up side effects live here rather than at import time: logging
+    setup, data directories and the database schema.
+    """
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[logging.FileHandler(APP_LOG_FILE), logging.StreamHandler(sys.stdout)]
+    )
+    
+    # Ensure directories exist
+    os.makedirs(PDF_DIR, exist_ok=True)
+    os.makedirs(EXCEL_DIR, exist_ok=True)
+    
+    # Create the database or add any columns missing from an older schema
+    database.init_database()
+    
+    # Create Flask app with explicit template folder
+    app = Flask(__name__, template_folder=TEMPLATE_DIR)
+    app.config['USE_X_SENDFILE'] = FILE_OFFLOAD == 'x-sendfile'
+    app.register_blueprint(bp)
+    
+    logger.info(f"Template directory path: {TEMPLATE_DIR}")
+    return app
+
+@bp.before_app_request
+def start_request_timer():
+    """Remember when the request started for the latency histogram."""
+    g.request_start = time.perf_counter()
 
-def run_scraper():
-    """Run the scraper from the scheduler."""
-    logger.info("Running scheduled scraper job")
+def has_profile_token(param):
+    """Check a query parameter against PROFILE_TOKEN."""
+    token = request.args.get(param)
+    return bool(profiling.PROFILE_TOKEN and token) and hmac.compare_digest(token, profiling.PROFILE_TOKEN)
+
+@bp.before_app_request
+def start_request_profile():
+    """Profile the request if PROFILE includes requests or ?profile=<token> is given."""
+    if profiling.enabled('requests') or has_profile_token('profile'):
+        stack = ExitStack()
+        stack.enter_context(profiling.profile(f"{request.method} {request.path}"))
+        g.profile_stack = stack
+
+@bp.teardown_app_request
+def stop_request_profile(exc):
+    """Stop and save the request profile, even if the view raised."""
+    stack = g.pop('profile_stack', None)
+    if stack is not None:
+        stack.close()
+
+@bp.after_app_request
+def record_request_duration(response):
+    """Observe the request latency, labelled by route pattern rather than URL."""
+    start = g.pop('request_start', None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.HTTP_REQUEST_DURATION.labels(
+            route=route, method=request.method, status=response.status_code
+        ).observe(time.perf_counter() - start)
+    return response
+
+def list_template_files():
+    """List the files in the templates directory."""
     try:
-        scraper.main()
+        return os.listdir(TEMPLATE_DIR)
     except Exception as e:
-        logger.error(f"Error in scheduled scraper job: {e}")
+        logger.error(f"Error listing template files: {e}")
+        return []
 
-# Initialize scheduler
-scheduler = BackgroundScheduler()
-scheduler.add_job(run_scraper, 'interval', hours=12)
-scheduler.start()
+def open_db_connection(read_only):
+    """Open a connection with the per-connection pragmas applied once."""
+    conn = profiling.connect(DB_PATH, timeout=DB_BUSY_TIMEOUT, cached_statements=DB_CACHED_STATEMENTS)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute(f'PRAGMA mmap_size={DB_MMAP_SIZE}')
+    conn.execute(f'PRAGMA cache_size=-{DB_CACHE_KIB}')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    if read_only:
+        conn.execute('PRAGMA query_only=ON')
+    return conn
 
-def convert_pdf_to_excel(pdf_path, excel_path):
+def get_db_connection():
     """
-    Convert a PDF to Excel.
+    Return this thread's database connection for the current request.
+    
+    Each worker thread keeps one read-only and one read-write connection
+    open across requests, so their page cache and prepared statements are
+    reused. GET and HEAD requests get the read-only one. Connections are
+    handed back when the app context ends and must not be closed by views.
     """
-    try:
-        logger.info(f"Converting PDF to Excel: {pdf_path}")
-        success = adobe_utils.convert_pdf_to_excel(pdf_path, excel_path)
-        
-        if success:
-            logger.info(f"Conversion successful: {excel_path}")
-            return True
-        else:
-            logger.error(f"PDF to Excel conversion failed for: {pdf_path}")
-            return False
+    if 'db' in g:
+        return g.db
     
-    except Exception as e:
-        logger.error(f"Error in PDF to Excel conversion: {e}")
-        return False
+    read_only = request.method in ('GET', 'HEAD')
+    key = ('ro' if read_only else 'rw', DB_PATH)
+    connections = getattr(_thread_connections, 'connections', None)
+    if connections is None:
+        connections = _thread_connections.connections = {}
+    
+    conn = connections.get(key)
+    if conn is None:
+        conn = connections[key] = open_db_connection(read_only)
+    
+    g.db = conn
+    return conn
+
+@bp.teardown_app_request
+def release_db_connection(exc):
+    """Hand the request's connection back to its thread, ending any open transaction."""
+    conn = g.pop('db', None)
+    if conn is not None and conn.in_transaction:
+        conn.rollback()
 
-def get_excel_path(pdf_path):
-    """Get the Excel path for a PDF."""
-    base_name = os.path.basename(pdf_path).replace('.pdf', '.xlsx')
-    return os.path.join(EXCEL_DIR, base_name)
+@functools.lru_cache(maxsize=None)
+def templates_digest():
+    """Hash the templates, so a deploy that changes them invalidates cached pages."""
+    digest = hashlib.sha256()
+    for name in sorted(list_template_files()):
+        digest.update(name.encode())
+        with open(os.path.join(TEMPLATE_DIR, name), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
 
-def ensure_excel_exists(report):
-    """Ensure Excel file exists for a report, converting if needed."""
-    pdf_path = report['pdf_path']
-    excel_path = get_excel_path(pdf_path)
+def versioned_response(render):
+    """
+    Serve a page that only changes when the data version does.
+    
+    The ETag and Last-Modified come from the data_version row, so a poll
+    with a matching If-None-Match or If-Modified-Since gets a 304 before the
+    page's own queries run. Otherwise the body rendered for the current
+    version is reused, and render() is only called again after a scan,
+    conversion or delete.
+    """
+    version, updated_at = data_version.current(get_db_connection())
+    etag = hashlib.sha256(f"{version}:{updated_at}:{templates_digest()}".encode()).hexdigest()[:32]
+    last_modified = datetime.datetime.fromtimestamp(int(updated_at), datetime.timezone.utc)
     
-    # If Excel doesn't exist, create it
-    if not os.path.exists(excel_path):
-        logger.info(f"Converting PDF to Excel: {pdf_path}")
-        convert_pdf_to_excel(pdf_path, excel_path)
+    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        response = Response(status=304)
+    else:
+        cached = _page_cache.get(request.path)
+        if cached is None or cached[0] != etag:
+            rendered = make_response(render())
+            if rendered.status_code != 200:
+                return rendered
+            cached = _page_cache[request.path] = (etag, rendered.get_data(), rendered.content_type)
+        response = Response(cached[1], content_type=cached[2])
     
-    return excel_path
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.headers['Cache-Control'] = PAGE_CACHE_CONTROL
+    return response
 
-@app.route('/')
+@bp.route('/')
 def index():
     """Render the homepage with latest reports and statistics."""
+    return versioned_response(render_index)
+
+def render_index():
+    """Query and render the homepage."""
     conn = get_db_connection()
     
     # Get PC reports
@@ -121,11 +243,14 @@ def index():
         'SELECT * FROM reports WHERE type = "CV" ORDER BY publish_date DESC LIMIT 5'
     ).fetchall()
     
-    # Get statistics
+    # Get statistics in a single pass over the type index
+    counts = conn.execute(
+        "SELECT COUNT(*), SUM(type = 'PC'), SUM(type = 'CV') FROM reports"
+    ).fetchone()
     stats = {
-        'total_reports': conn.execute('SELECT COUNT(*) FROM reports').fetchone()[0],
-        'pc_reports': conn.execute('SELECT COUNT(*) FROM reports WHERE type = "PC"').fetchone()[0],
-        'cv_reports': conn.execute('SELECT COUNT(*) FROM reports WHERE type = "CV"').fetchone()[0]
+        'total_reports': counts[0],
+        'pc_reports': counts[1] or 0,
+        'cv_reports': counts[2] or 0
     }
     
     # Get months with data and convert to regular dictionaries
@@ -146,7 +271,6 @@ def index():
             'count': row['count']
         })
     
-    conn.close()
     
     # Check when the last successful scan happened
     last_scan = "Unknown"
@@ -169,64 +293,174 @@ def index():
         last_scan=last_scan
     )
 
-@app.route('/reports/<report_type>')
+@bp.route('/reports/<report_type>')
 def reports(report_type):
     """Show all reports of a specific type."""
     if report_type not in ['PC', 'CV']:
         return jsonify({'error': 'Invalid report type'}), 400
+    
+    def render():
+        conn = get_db_connection()
+        reports = conn.execute(
+            'SELECT * FROM reports WHERE type = ? ORDER BY publish_date DESC',
+            (report_type,)
+        ).fetchall()
         
+        return render_template(
+            'reports.html', 
+            reports=reports, 
+            report_type=report_type
+        )
+    
+    return versioned_response(render)
+
+@bp.route('/reports/<int:report_id>/preview')
+def preview_report(report_id):
+    """Show the Monthly table of a converted report without downloading the workbook."""
     conn = get_db_connection()
-    reports = conn.execute(
-        'SELECT * FROM reports WHERE type = ? ORDER BY publish_date DESC',
-        (report_type,)
-    ).fetchall()
-    conn.close()
+    report = conn.execute('SELECT * FROM reports WHERE id = ?', (report_id,)).fetchone()
     
-    return render_template(
-        'reports.html', 
-        reports=reports, 
-        report_type=report_type
+    if not report:
+        abort(404)
+    
+    rows = None
+    if report['conversion_status'] == 'converted' and report['excel_path']:
+        rows = previews.load(report['excel_path'])
+        if rows is None:
+            try:
+                rows = previews.build(report['excel_path'])
+            except Exception as e:
+                logger.error(f"Error building preview for report {report_id}: {e}")
+    
+    return render_template('preview.html', report=report, rows=rows)
+
+def file_etag(path):
+    """Return a strong ETag for a file based on a hash of its content."""
+    stat = os.stat(path)
+    cached = _etag_cache.get(path)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+    
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    
+    etag = digest.hexdigest()[:32]
+    _etag_cache[path] = (stat.st_mtime_ns, stat.st_size, etag)
+    return etag
+
+def send_data_file(directory, filename, cache_control):
+    """
+    Send a file from the data directory with a content ETag and caching headers.
+    
+    If-None-Match and Range requests are answered by werkzeug's conditional
+    handling. With FILE_OFFLOAD set, only headers are produced here and the
+    front proxy streams the body, so large downloads don't hold a worker.
+    Files that have been moved to the compressed archive are served from
+    memory instead.
+    """
+    path = safe_join(directory, filename)
+    if path is None:
+        abort(404)
+    if not os.path.isfile(path):
+        return send_archived_file(path, cache_control)
+    
+    etag = file_etag(path)
+    
+    if FILE_OFFLOAD == 'x-accel-redirect':
+        response = Response(mimetype=mimetypes.guess_type(path)[0] or 'application/octet-stream')
+        response.headers['X-Accel-Redirect'] = f"{X_ACCEL_PREFIX.rstrip('/')}/{os.path.relpath(path, DATA_DIR)}"
+        response.set_etag(etag)
+        response = response.make_conditional(request)
+    else:
+        response = send_file(path, etag=etag, conditional=True)
+    
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+def send_archived_file(path, cache_control):
+    """Serve a file from the compressed archive, decompressing it on demand."""
+    entry = archive.lookup(path)
+    if entry is None:
+        abort(404)
+    
+    try:
+        data = archive.read_entry(entry)
+    except FileNotFoundError:
+        abort(404)
+    
+    response = send_file(
+        io.BytesIO(data),
+        download_name=os.path.basename(path),
+        etag=entry['etag'],
+        last_modified=entry['mtime'],
+        conditional=True
     )
+    response.headers['Cache-Control'] = cache_control
+    return response
 
-@app.route('/pdf/<path:filename>')
+@bp.route('/pdf/<path:filename>')
 def serve_pdf(filename):
     """Serve a PDF file."""
-    return send_from_directory(PDF_DIR, filename)
+    return send_data_file(PDF_DIR, filename, PDF_CACHE_CONTROL)
 
-@app.route('/excel/<path:filename>')
+@bp.route('/excel/<path:filename>')
 def serve_excel(filename):
     """Serve an Excel file."""
-    return send_from_directory(EXCEL_DIR, filename)
+    return send_data_file(EXCEL_DIR, filename, EXCEL_CACHE_CONTROL)
 
-@app.route('/convert/<int:report_id>')
+@bp.route('/convert/<int:report_id>')
 def convert_report(report_id):
-    """Convert a report's PDF to Excel and serve it."""
-    conn = get_db_connection()
-    report = conn.execute('SELECT * FROM reports WHERE id = ?', (report_id,)).fetchone()
-    conn.close()
+    """
+    Convert a report's PDF to Excel and serve it.
+    
+    If Adobe is failing, the conversion is left to the scheduler's retry
+    queue and a page that waits for it is returned straight away.
+    """
+    import converter
+    
+    report = converter.get_report(report_id)
     
     if not report:
         return jsonify({'error': 'Report not found'}), 404
     
-    pdf_path = report['pdf_path']
-    excel_path = get_excel_path(pdf_path)
-    
     # Convert PDF to Excel if not already done
-    if not os.path.exists(excel_path):
-        success = convert_pdf_to_excel(pdf_path, excel_path)
-        if not success:
-            return jsonify({'error': 'Failed to convert PDF to Excel'}), 500
-
-        # Add the monthly table for PC reports
-        if report['type'] == 'PC':
-            excel_formatter.extract_monthly_table(excel_path)
+    excel_path = converter.ensure_excel_exists(report)
+    if not excel_path:
+        report = converter.get_report(report_id)
+        if report['conversion_status'] == 'queued':
+            return render_template('queued.html', report=report), 202
+        return jsonify({'error': 'Failed to convert PDF to Excel'}), 500
     
     # Redirect to the Excel file
-    return redirect(url_for('serve_excel', filename=os.path.basename(excel_path)))
+    return redirect(url_for('main.serve_excel', filename=os.path.basename(excel_path)))
 
-@app.route('/api/stats')
+@bp.route('/api/reports/<int:report_id>/conversion')
+def conversion_status(report_id):
+    """Return the conversion state of a report, including its retry schedule."""
+    conn = get_db_connection()
+    report = conn.execute('SELECT conversion_status FROM reports WHERE id = ?', (report_id,)).fetchone()
+    entry = conn.execute('SELECT * FROM conversion_queue WHERE report_id = ?', (report_id,)).fetchone()
+    
+    if not report:
+        return jsonify({'error': 'Report not found'}), 404
+    
+    return jsonify({
+        'id': report_id,
+        'status': report['conversion_status'],
+        'attempts': entry['attempts'] if entry else 0,
+        'next_attempt_at': entry['next_attempt_at'] if entry else None,
+        'last_error': entry['last_error'] if entry else None
+    })
+
+@bp.route('/api/stats')
 def stats():
     """Return statistics about the reports."""
+    return versioned_response(render_stats)
+
+def render_stats():
+    """Query the statistics returned by /api/stats."""
     conn = get_db_connection()
     
     pc_count = conn.execute('SELECT COUNT(*) FROM reports WHERE type = "PC"').fetchone()[0]
@@ -240,7 +474,6 @@ def stats():
         'SELECT publish_date FROM reports WHERE type = "CV" ORDER BY publish_date DESC LIMIT 1'
     ).fetchone()
     
-    conn.close()
     
     return jsonify({
         'total_reports': pc_count + cv_count,
@@ -250,17 +483,40 @@ def stats():
         'latest_cv': latest_cv[0] if latest_cv else None
     })
 
-@app.route('/run-scan', methods=['POST'])
+@bp.route('/search')
+def search():
+    """Search the text of all reports."""
+    query = request.args.get('q', '').strip()
+    
+    results = []
+    if query:
+        conn = get_db_connection()
+        results = search_index.search(conn, query)
+    
+    return render_template('search.html', query=query, results=results)
+
+@bp.route('/api/search')
+def api_search():
+    """Return ranked search hits with HTML snippets as JSON."""
+    query = request.args.get('q', '').strip()
+    limit = min(request.args.get('limit', search_index.SEARCH_LIMIT, type=int), search_index.SEARCH_LIMIT)
+    
+    conn = get_db_connection()
+    results = search_index.search(conn, query, limit)
+    
+    return jsonify({'query': query, 'results': results})
+
+@bp.route('/run-scan', methods=['POST'])
 def run_scan():
-    """Manually trigger a scan."""
+    """Ask the scheduler process to run a scan."""
     try:
-        scraper.main()
-        return jsonify({'success': True, 'message': 'Scan completed successfully'})
+        task_id = tasks.request_task('scan')
+        return jsonify({'success': True, 'message': 'Scan queued', 'task_id': task_id})
     except Exception as e:
-        logger.error(f"Error in manual scan: {e}")
+        logger.error(f"Error queueing manual scan: {e}")
         return jsonify({'success': False, 'message': str(e)}), 500
 
-@app.route('/logs')
+@bp.route('/logs')
 def view_logs():
     """View the application logs."""
     try:
@@ -277,43 +533,54 @@ def view_logs():
     
     return render_template('logs.html', logs=logs)
 
-@app.route('/delete-reports', methods=['POST'])
+@bp.route('/delete-reports', methods=['POST'])
 def delete_reports():
     """Delete selected reports."""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'success': False, 'message': 'Expected a JSON object with report_ids'}), 400
+    
+    report_ids = data.get('report_ids', [])
+    if not isinstance(report_ids, list):
+        return jsonify({'success': False, 'message': 'report_ids must be a list'}), 400
+    
+    if not report_ids:
+        return jsonify({'success': False, 'message': 'No reports selected'}), 400
+    
+    # Checkbox values arrive as strings; bools would pass int() as 0 and 1
+    if not all(isinstance(report_id, (int, str)) and not isinstance(report_id, bool)
+               and str(report_id).isdigit() for report_id in report_ids):
+        return jsonify({'success': False, 'message': 'report_ids must be report numbers'}), 400
+    
+    report_ids = [int(report_id) for report_id in report_ids]
+    
     try:
-        report_ids = request.json.get('report_ids', [])
-        
-        if not report_ids:
-            return jsonify({'success': False, 'message': 'No reports selected'}), 400
+        placeholders = ','.join(['?'] * len(report_ids))
         
         conn = get_db_connection()
         
-        # Get file paths before deleting from database
+        # Get file paths and delete the rows in one transaction
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            rows = conn.execute(
+                f'SELECT pdf_path, excel_path FROM reports WHERE id IN ({placeholders})',
+                report_ids
+            ).fetchall()
+            conn.execute(f'DELETE FROM reports WHERE id IN ({placeholders})', report_ids)
+            conn.execute(f'DELETE FROM conversion_queue WHERE report_id IN ({placeholders})', report_ids)
+            search_index.remove_reports(conn, report_ids)
+            data_version.bump(conn)
+        
         file_paths = []
-        for report_id in report_ids:
-            report = conn.execute('SELECT pdf_path FROM reports WHERE id = ?', (report_id,)).fetchone()
-            if report and report['pdf_path']:
-                file_paths.append(report['pdf_path'])
-                
-                # Also add Excel path if it exists
-                excel_path = get_excel_path(report['pdf_path'])
-                if os.path.exists(excel_path):
-                    file_paths.append(excel_path)
+        for row in rows:
+            if row['pdf_path']:
+                file_paths.append(row['pdf_path'])
+            if row['excel_path']:
+                file_paths.append(row['excel_path'])
+                file_paths.append(previews.preview_path(row['excel_path']))
         
-        # Delete from database
-        placeholders = ','.join(['?'] * len(report_ids))
-        conn.execute(f'DELETE FROM reports WHERE id IN ({placeholders})', report_ids)
-        conn.commit()
-        conn.close()
-        
-        # Delete files
-        for path in file_paths:
-            try:
-                if os.path.exists(path):
-                    os.remove(path)
-                    logger.info(f"Deleted file: {path}")
-            except Exception as e:
-                logger.error(f"Error deleting file {path}: {e}")
+        # Files are removed off the request thread
+        file_reaper.schedule_removal(file_paths)
         
         return jsonify({
             'success': True, 
@@ -324,26 +591,61 @@ def delete_reports():
         logger.error(f"Error deleting reports: {e}")
         return jsonify({'success': False, 'message': str(e)}), 500
 
-@app.route('/health')
+def profiles_authorized():
+    """
+    The profile pages need ?token=<PROFILE_TOKEN> when a token is configured,
+    and otherwise only exist while PROFILE is set.
+    """
+    if profiling.PROFILE_TOKEN:
+        return has_profile_token('token')
+    return bool(profiling.PROFILE_TARGETS)
+
+@bp.route('/profiles')
+def view_profiles():
+    """List the saved request, scan and conversion profiles."""
+    if not profiles_authorized():
+        abort(404)
+    
+    return render_template(
+        'profiles.html',
+        profiles=profiling.list_profiles(),
+        token=request.args.get('token', '')
+    )
+
+@bp.route('/profiles/<path:filename>')
+def download_profile(filename):
+    """Serve a saved profile (.prof) or its text summary (.txt)."""
+    if not profiles_authorized() or not filename.endswith(('.prof', '.txt')):
+        abort(404)
+    
+    return send_from_directory(profiling.PROFILE_DIR, filename, as_attachment=filename.endswith('.prof'))
+
+@bp.route('/metrics')
+def prometheus_metrics():
+    """Expose metrics in the Prometheus text format, aggregated across processes."""
+    body, content_type = metrics.generate()
+    return Response(body, content_type=content_type)
+
+@bp.route('/health')
 def health_check():
     """Simple health check endpoint that doesn't require templates."""
     return jsonify({
         'status': 'ok',
         'timestamp': datetime.datetime.now().isoformat(),
-        'template_dir': template_dir,
-        'template_files': template_files,
+        'template_dir': TEMPLATE_DIR,
+        'template_files': list_template_files(),
         'db_exists': os.path.exists(DB_PATH),
         'pdf_dir_exists': os.path.exists(PDF_DIR)
     })
 
-@app.route('/debug')
+@bp.route('/debug')
 def debug_info():
     """Return debug information about the environment."""
     env_vars = {k: v for k, v in os.environ.items()}
     dirs = {
         'current': os.listdir('.'),
         'app': os.listdir('/app') if os.path.exists('/app') else [],
-        'templates': template_files,
+        'templates': list_template_files(),
         'data': os.listdir('/app/data') if os.path.exists('/app/data') else []
     }
     
@@ -353,49 +655,38 @@ def debug_info():
         'python_path': sys.path
     })
 
-@app.route('/convert-all', methods=['POST'])
+@bp.route('/convert-all', methods=['POST'])
 def convert_all_pdfs():
-    """Convert all PDFs to Excel format."""
+    """Ask the scheduler process to convert all PDFs to Excel format."""
     try:
         conn = get_db_connection()
-        reports = conn.execute('SELECT * FROM reports').fetchall()
-        conn.close()
-        
-        success_count = 0
-        fail_count = 0
+        pending_count = conn.execute(
+            "SELECT COUNT(*) FROM reports WHERE conversion_status != 'converted'"
+        ).fetchone()[0]
         
-        for report in reports:
-            pdf_path = report['pdf_path']
-            excel_path = get_excel_path(pdf_path)
-            
-            # Skip if Excel already exists
-            if os.path.exists(excel_path):
-                success_count += 1
-                continue
-            
-            # Convert PDF to Excel
-            success = convert_pdf_to_excel(pdf_path, excel_path)
-            if success:
-                if report['type'] == 'PC':
-                    excel_formatter.extract_monthly_table(excel_path)
-                success_count += 1
-            else:
-                fail_count += 1
+        task_id = tasks.request_task('convert_all')
         
         return jsonify({
             'success': True,
-            'message': f'Converted {success_count} PDFs to Excel, {fail_count} failed',
-            'successes': success_count,
-            'failures': fail_count
+            'message': f'Queued conversion of {pending_count} PDFs to Excel',
+            'pending': pending_count,
+            'task_id': task_id
         })
     except Exception as e:
-        logger.error(f"Error in batch conversion: {e}")
+        logger.error(f"Error queueing batch conversion: {e}")
         return jsonify({'success': False, 'message': str(e)}), 500
 
-if __name__ == '__main__':
-    # Initialize database if it doesn't exist
-    if not os.path.exists(DB_PATH):
-        scraper.init_database()
+@bp.route('/api/tasks/<int:task_id>')
+def task_status(task_id):
+    """Return the status of a task requested from the scheduler process."""
+    conn = get_db_connection()
+    task = conn.execute('SELECT * FROM tasks WHERE id = ?', (task_id,)).fetchone()
     
+    if not task:
+        return jsonify({'error': 'Task not found'}), 404
+    
+    return jsonify(dict(task))
+
+if __name__ == '__main__':
     # Run the Flask app with debug enabled for troubleshooting
-    app.run(host='0.0.0.0', port=9734, debug=True)
\ No newline at end of file
+    create_app().run(host='0.0.0.0', port=9734, debug=True)
\ No newline at end of file
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+
+import os
+import lzma
+import fcntl
+import sqlite3
+import hashlib
+import logging
+import datetime
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# Set up logging
+logger = logging.getLogger('acea_archive')
+
+# Constants
+DB_PATH = '/app/data/database.db'
+PDF_DIR = '/app/data/pdfs'
+EXCEL_DIR = '/app/data/excel'
+ARCHIVE_DIR = '/app/data/archive'
+# PDFs and workbooks untouched for this many days are moved into the packs;
+# 0 turns archiving off
+ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', '180'))
+MAX_PACK_BYTES = 256 * 1024 * 1024
+COMPRESSION_PRESET = 9
+# Files are only packed if they shrink to at most this fraction of their
+# size; most PDFs and workbooks are already deflate-compressed
+MAX_COMPRESSED_RATIO = 0.9
+# A quick compression of this much of a file decides whether the full
+# compression is worth trying, so incompressible files cost little each run
+SAMPLE_BYTES = 1024 * 1024
+# Decompressed files kept in memory by each process
+CACHE_MAX_BYTES = int(os.environ.get('ARCHIVE_CACHE_MB', '32')) * 1024 * 1024
+
+# (pack, offset) -> bytes, most recently used last
+_cache = OrderedDict()
+_cache_bytes = 0
+_cache_lock = threading.Lock()
+
+def create_index(conn):
+    """Create the table that maps archived file paths to their place in a pack."""
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS archived_files (
+        path TEXT PRIMARY KEY,
+        pack TEXT NOT NULL,
+        offset INTEGER NOT NULL,
+        length INTEGER NOT NULL,
+        size INTEGER NOT NULL,
+        mtime REAL NOT NULL,
+        etag TEXT NOT NULL,
+        archived_at TEXT NOT NULL
+    )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_archived_files_pack ON archived_files (pack)')
+
+def get_db_connection():
+    """Create a database connection."""
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+@contextmanager
+def pack_lock():
+    """Serialise writers to the packs across processes."""
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    with open(os.path.join(ARCHIVE_DIR, '.lock'), 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def lookup(path):
+    """
+    Find the archive entry of a file that is no longer on disk.
+
+    Returns:
+        sqlite3.Row: The entry, or None if the file isn't archived
+    """
+    conn = get_db_connection()
+    try:
+        return conn.execute('SELECT * FROM archived_files WHERE path = ?', (path,)).fetchone()
+    except sqlite3.OperationalError:
+        # The table doesn't exist until the database has been initialized
+        return None
+    finally:
+        conn.close()
+
+def _cache_get(key):
+    with _cache_lock:
+        data = _cache.get(key)
+        if data is not None:
+            _cache.move_to_end(key)
+        return data
+
+def _cache_put(key, data):
+    global _cache_bytes
+    # Very large files would evict everything else for a single reader
+    if len(data) > CACHE_MAX_BYTES // 4:
+        return
+    with _cache_lock:
+        if key in _cache:
+            return
+        _cache[key] = data
+        _cache_bytes += len(data)
+        while _cache_bytes > CACHE_MAX_BYTES:
+            _, evicted = _cache.popitem(last=False)
+            _cache_bytes -= len(evicted)
+
+def read_entry(entry):
+    """Return the decompressed content of an archive entry, via the LRU cache."""
+    key = (entry['pack'], entry['offset'])
+    data = _cache_get(key)
+    if data is not None:
+        return data
+
+    with open(os.path.join(ARCHIVE_DIR, entry['pack']), 'rb') as f:
+        f.seek(entry['offset'])
+        data = lzma.decompress(f.read(entry['length']))
+    if len(data) != entry['size']:
+        raise IOError(f"Archived copy of {entry['path']} is corrupt")
+
+    _cache_put(key, data)
+    return data
+
+def read(path):
+    """
+    Read a data file from disk, or from the archive if it has been packed.
+
+    Returns:
+        bytes: The file content, or None if the file doesn't exist anywhere
+    """
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+
+    entry = lookup(path)
+    return read_entry(entry) if entry else None
+
+def restore(path):
+    """
+    Put an archived file back on disk, e.g. before a conversion reads it.
+
+    The restored file counts as recently used, so it isn't archived again
+    until it has gone unused for ARCHIVE_AFTER_DAYS once more.
+
+    Returns:
+        bool: True if the file is on disk afterwards
+    """
+    if os.path.exists(path):
+        return True
+
+    entry = lookup(path)
+    if entry is None:
+        return False
+
+    data = read_entry(entry)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=f".{os.path.basename(path)}.")
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+    conn = get_db_connection()
+    conn.execute('DELETE FROM archived_files WHERE path = ?', (path,))
+    conn.commit()
+    conn.close()
+
+    logger.info(f"Restored {path} from the archive")
+    return True
+
+def _current_pack():
+    """Name of the pack new entries are appended to, starting a new one when full."""
+    packs = sorted(name for name in os.listdir(ARCHIVE_DIR) if name.startswith('pack-') and name.endswith('.xz'))
+    if packs and os.path.getsize(os.path.join(ARCHIVE_DIR, packs[-1])) < MAX_PACK_BYTES:
+        return packs[-1]
+    number = int(packs[-1][len('pack-'):-len('.xz')]) + 1 if packs else 1
+    return f"pack-{number:06d}.xz"
+
+def archive_file(conn, path):
+    """
+    Compress one file into the current pack and remove it from disk.
+
+    The data is synced to the pack before the index row is committed, and
+    the original is only removed after that, so a crash can leave unused
+    bytes in a pack but never loses a file. Files that don't compress by
+    much are left on disk, where they are served without decompressing.
+    Must hold pack_lock().
+
+    Returns:
+        int: Bytes saved, or None if the file was left on disk
+    """
+    stat = os.stat(path)
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    sample = data[:SAMPLE_BYTES]
+    if len(lzma.compress(sample, preset=0)) > len(sample) * MAX_COMPRESSED_RATIO:
+        return None
+    compressed = lzma.compress(data, preset=COMPRESSION_PRESET)
+    if len(compressed) > len(data) * MAX_COMPRESSED_RATIO:
+        return None
+
+    pack = _current_pack()
+    with open(os.path.join(ARCHIVE_DIR, pack), 'ab') as f:
+        offset = f.tell()
+        f.write(compressed)
+        f.flush()
+        os.fsync(f.fileno())
+
+    # Same ETag the web app computes for the file on disk, so client caches stay valid
+    etag = hashlib.sha256(data).hexdigest()[:32]
+    conn.execute(
+        'INSERT OR REPLACE INTO archived_files (path, pack, offset, length, size, mtime, etag, archived_at) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+        (path, pack, offset, len(compressed), len(data), stat.st_mtime, etag,
+         datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+    )
+    conn.commit()
+
+    # A conversion may have replaced the workbook while it was being packed
+    current = os.stat(path)
+    if (current.st_ino, current.st_mtime_ns) == (stat.st_ino, stat.st_mtime_ns):
+        os.remove(path)
+    else:
+        conn.execute('DELETE FROM archived_files WHERE path = ?', (path,))
+        conn.commit()
+        return None
+
+    return len(data) - len(compressed)
+
+def archive_old_files(min_age_days=ARCHIVE_AFTER_DAYS):
+    """
+    Move the report files not modified or opened for min_age_days into the packs.
+
+    Returns:
+        tuple: (files_archived, bytes_saved)
+    """
+    if min_age_days <= 0:
+        return 0, 0
+
+    conn = get_db_connection()
+    referenced = set()
+    for row in conn.execute('SELECT pdf_path, excel_path FROM reports'):
+        referenced.update(path for path in row if path)
+
+    cutoff = datetime.datetime.now().timestamp() - min_age_days * 86400
+    archived = saved = 0
+
+    with pack_lock():
+        for directory in (PDF_DIR, EXCEL_DIR):
+            try:
+                entries = list(os.scandir(directory))
+            except FileNotFoundError:
+                continue
+
+            for entry in entries:
+                # Temp files and orphans are left to the conversion and the file reaper
+                if not entry.is_file() or entry.path not in referenced:
+                    continue
+                try:
+                    stat = entry.stat()
+                    if max(stat.st_mtime, stat.st_atime) > cutoff:
+                        continue
+                    result = archive_file(conn, entry.path)
+                    if result is not None:
+                        saved += result
+                        archived += 1
+                except FileNotFoundError:
+                    pass
+                except Exception as e:
+                    logger.error(f"Error archiving {entry.path}: {e}")
+
+        # Entries whose report has been deleted since they were packed
+        stale = [row['path'] for row in conn.execute('SELECT path FROM archived_files')
+                 if row['path'] not in referenced]
+        _forget(conn, stale)
+
+    conn.close()
+    logger.info(f"Archived {archived} files, saving {saved / (1024 * 1024):.1f} MB")
+    return archived, saved
+
+def _forget(conn, paths):
+    """Drop archive entries and delete packs that no longer hold any. Must hold pack_lock()."""
+    if not paths:
+        return
+    conn.executemany('DELETE FROM archived_files WHERE path = ?', [(path,) for path in paths])
+    conn.commit()
+
+    live = {row['pack'] for row in conn.execute('SELECT DISTINCT pack FROM archived_files')}
+    for name in os.listdir(ARCHIVE_DIR):
+        if name.startswith('pack-') and name.endswith('.xz') and name not in live:
+            os.remove(os.path.join(ARCHIVE_DIR, name))
+            logger.info(f"Deleted empty archive pack: {name}")
+
+def forget(paths):
+    """Remove deleted report files from the archive."""
+    conn = get_db_connection()
+    try:
+        with pack_lock():
+            _forget(conn, list(paths))
+    except sqlite3.OperationalError as e:
+        logger.error(f"Error removing files from the archive: {e}")
+    finally:
+        conn.close()
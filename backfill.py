@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import time
+import sqlite3
+import logging
+import argparse
+import datetime
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from database import init_database
+import data_version
+import release_calendar
+import scraper
+import search_index
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.FileHandler('/app/logs/backfill.log'), logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger('acea_backfill')
+
+# Constants
+DB_PATH = '/app/data/database.db'
+FILES_BASE_URL = 'https://www.acea.auto/files/'
+DEFAULT_WORKERS = 4
+DEFAULT_RATE = 2.0  # requests per second across all workers
+BATCH_SIZE = 25  # probe results written per transaction
+# Run below the web server and scheduler so a long backfill doesn't slow them down
+NICENESS = 10
+
+class RateLimiter:
+    """Space calls evenly across threads so at most `rate` start per second."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        time.sleep(max(0.0, slot - now))
+
+def report_names(year):
+    """
+    Filenames (without .pdf) ACEA has used for the reports of a year.
+
+    Returns:
+        list: (report_type, name) tuples
+    """
+    names = [('PC', f"Press_release_car_registrations_{month}_{year}") for month in release_calendar.MONTHS]
+    names.append(('PC', f"Press_release_car_registrations_first_half_{year}"))
+    names.append(('PC', f"Press_release_car_registrations_{year}"))
+
+    for label in ('Q1', 'Q1-Q2', 'Q1-Q3', 'January'):
+        names.append(('CV', f"Press_release_commercial_vehicle_registrations_{label}_{year}"))
+    names.append(('CV', f"Press_release_commercial_vehicle_registrations_{year}"))
+
+    return names
+
+def candidate_urls(start_year, end_year=None, now=None):
+    """
+    Build the candidate report URLs for a range of years, oldest first.
+
+    Periods that haven't ended yet are left out.
+
+    Returns:
+        list: (report_type, url) tuples
+    """
+    now = now or datetime.datetime.now()
+    end_year = end_year or now.year
+
+    candidates = []
+    for year in range(start_year, end_year + 1):
+        for report_type, name in report_names(year):
+            end = release_calendar.period_end(name)
+            if end is not None and end > now:
+                continue
+            candidates.append((report_type, f"{FILES_BASE_URL}{name}.pdf"))
+            candidates.append((report_type, f"{FILES_BASE_URL}{name}_rev.pdf"))
+    return candidates
+
+def publish_date(url):
+    """
+    Date a historical report by the end of the period its filename names.
+
+    Falls back to today only for filenames release_calendar can't parse.
+    """
+    end = release_calendar.period_end(url)
+    return (end or datetime.datetime.now()).strftime('%Y-%m-%d')
+
+def pending_candidates(conn, candidates):
+    """Drop the candidates that are already stored or were checked by an earlier run."""
+    checked = {url for (url,) in conn.execute(
+        "SELECT url FROM backfill_progress WHERE status IN ('found', 'missing')"
+    )}
+    stored = set()
+    for pdf_url, pdf_path in conn.execute('SELECT pdf_url, pdf_path FROM reports'):
+        stored.add(os.path.basename(pdf_url or ''))
+        stored.add(os.path.basename(pdf_path or ''))
+
+    return [(report_type, url) for report_type, url in candidates
+            if url not in checked and os.path.basename(url) not in stored]
+
+def probe(limiter, url):
+    """
+    Download one candidate URL and extract its text for the search index.
+
+    Returns:
+        tuple: (status, pdf_path, text) where status is found, missing or error
+    """
+    limiter.wait()
+    try:
+        pdf_path = scraper.download_pdf(url, os.path.basename(url), raise_errors=True)
+    except requests.exceptions.RequestException:
+        return 'error', None, None
+    if not pdf_path:
+        return 'missing', None, None
+    return 'found', pdf_path, search_index.extract_text(pdf_path)
+
+def flush(conn, reports, texts, progress):
+    """
+    Insert a batch of reports, their search index entries and their
+    checkpoint rows in one transaction. Reports a scan recorded in the
+    meantime are left as they are.
+    """
+    with conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO reports (type, title, url, pdf_url, pdf_path, publish_date, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            reports
+        )
+        search_index.index_reports_by_pdf_url(conn, texts)
+        if reports:
+            data_version.bump(conn)
+        conn.executemany(
+            'INSERT OR REPLACE INTO backfill_progress (url, status, checked_at) VALUES (?, ?, ?)',
+            progress
+        )
+    reports.clear()
+    texts.clear()
+    progress.clear()
+
+def backfill(start_year, end_year=None, workers=DEFAULT_WORKERS, rate=DEFAULT_RATE, batch_size=BATCH_SIZE):
+    """
+    Probe and download every report published since start_year.
+
+    Candidates are probed in parallel under a shared rate limit. Results are
+    checkpointed in the backfill_progress table as they are written, so
+    running the same command again after an interruption only tries the
+    URLs that were never reached or failed with a network error.
+
+    Returns:
+        dict: Counts of found, missing and error candidates
+    """
+    init_database()
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+
+    candidates = candidate_urls(start_year, end_year)
+    todo = pending_candidates(conn, candidates)
+    logger.info(f"Backfilling from {start_year}: {len(todo)} of {len(candidates)} candidate URLs left to try")
+
+    counts = {'found': 0, 'missing': 0, 'error': 0}
+    limiter = RateLimiter(rate)
+    reports, texts, progress = [], [], []
+    pool = ThreadPoolExecutor(max_workers=workers)
+
+    try:
+        futures = {pool.submit(probe, limiter, url): (report_type, url) for report_type, url in todo}
+        for future in as_completed(futures):
+            report_type, url = futures[future]
+            status, pdf_path, text = future.result()
+            counts[status] += 1
+            now = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+            if status == 'found':
+                title, _ = scraper.describe_report(report_type, os.path.basename(url))
+                reports.append((report_type, title, url, url, pdf_path, publish_date(url), now))
+                texts.append((text, url))
+            progress.append((url, status, now))
+
+            if len(progress) >= batch_size:
+                flush(conn, reports, texts, progress)
+                logger.info(f"Backfill progress: {sum(counts.values())}/{len(todo)} tried, {counts['found']} found")
+    except KeyboardInterrupt:
+        logger.info("Backfill interrupted, saving progress")
+        raise
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        flush(conn, reports, texts, progress)
+        conn.close()
+
+    logger.info(f"Backfill finished: {counts['found']} reports found, {counts['missing']} missing, "
+                f"{counts['error']} errors (retried on the next run)")
+    return counts
+
+def main():
+    """Command-line entry point: python backfill.py --from YEAR."""
+    arg_parser = argparse.ArgumentParser(description='Load historical ACEA registration reports.')
+    arg_parser.add_argument('--from', dest='start_year', type=int, required=True, help='first year to load')
+    arg_parser.add_argument('--to', dest='end_year', type=int, help='last year to load (default: this year)')
+    arg_parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='parallel downloads')
+    arg_parser.add_argument('--rate', type=float, default=DEFAULT_RATE, help='requests per second')
+    args = arg_parser.parse_args()
+
+    os.nice(NICENESS)
+    try:
+        backfill(args.start_year, args.end_year, args.workers, args.rate)
+    except KeyboardInterrupt:
+        sys.exit(130)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,9 @@
+"""
+Reproducible benchmarks for the scan, conversion and web paths.
+
+Run from the app directory (inside the container, where /app/logs exists):
+
+    python -m benchmarks                   # everything, results in benchmarks/results/
+    python -m benchmarks --only web,excel --quick
+    python -m benchmarks.compare old.json new.json
+"""
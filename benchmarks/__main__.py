@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import datetime
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks import bench_startup, bench_scan, bench_excel, bench_convert, bench_web, bench_db
+
+RESULTS_DIR = os.path.join(REPO_ROOT, 'benchmarks', 'results')
+
+# name -> (module, full parameters, quick parameters)
+BENCHMARKS = {
+    'startup': (bench_startup, {'repeat': 5}, {'repeat': 2}),
+    'scan': (bench_scan, {'latency': 0.05, 'hit_every': 10}, {'latency': 0.01, 'hit_every': 10}),
+    'excel': (bench_excel, {'sizes': (30, 200, 1000, 5000), 'repeat': 3}, {'sizes': (30, 200), 'repeat': 1}),
+    'convert': (bench_convert, {'reports': 50, 'delay': 0.2}, {'reports': 10, 'delay': 0.05}),
+    'web': (bench_web, {'reports': 5000, 'requests': 200, 'threads': 4},
+            {'reports': 1000, 'requests': 40, 'threads': 2}),
+    'db': (bench_db, {'reports': 5000, 'requests': 500}, {'reports': 1000, 'requests': 50}),
+}
+
+def git_revision():
+    """Return the current commit hash, or None outside a git checkout."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    """Run the selected benchmarks and write the results to JSON."""
+    arg_parser = argparse.ArgumentParser(description='Run the ACEA monitor benchmarks.')
+    arg_parser.add_argument('--only', help=f"comma-separated subset of: {', '.join(BENCHMARKS)}")
+    arg_parser.add_argument('--quick', action='store_true', help='smaller inputs for a fast smoke run')
+    arg_parser.add_argument('--output', help='results file (default: benchmarks/results/<timestamp>.json)')
+    args = arg_parser.parse_args()
+
+    # Keep the app's own logging from drowning the benchmark output
+    logging.basicConfig(level=logging.WARNING)
+
+    selected = args.only.split(',') if args.only else list(BENCHMARKS)
+    unknown = [name for name in selected if name not in BENCHMARKS]
+    if unknown:
+        arg_parser.error(f"Unknown benchmarks: {', '.join(unknown)}")
+
+    report = {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'quick': args.quick,
+        'benchmarks': {},
+    }
+
+    for name in selected:
+        module, params, quick_params = BENCHMARKS[name]
+        print(f"Running {name} benchmark...", flush=True)
+        start = time.perf_counter()
+        report['benchmarks'][name] = module.run(**(quick_params if args.quick else params))
+        print(f"  done in {time.perf_counter() - start:.1f}s", flush=True)
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+    # Benchmarks that enforce a budget report it as {'budget': {'passed': ...}}
+    failed = [name for name, result in report['benchmarks'].items()
+              if result.get('budget', {}).get('passed') is False]
+    if failed:
+        for name in failed:
+            print(f"Budget exceeded in {name}: {report['benchmarks'][name]['budget']}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
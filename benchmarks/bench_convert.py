@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+import os
+import time
+import shutil
+import threading
+from benchmarks.common import scratch_dir, patched_paths, seed_reports
+from benchmarks.workbooks import make_acea_workbook
+
+class StubAdobe:
+    """Stand-in for adobe_utils.convert_pdf_to_excel that copies a template workbook."""
+
+    def __init__(self, template, delay):
+        self.template = template
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, pdf_path, excel_path):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        shutil.copyfile(self.template, excel_path)
+        return True
+
+def run(reports=50, delay=0.2, countries=30):
+    """
+    Time converter.convert_pending with a stubbed Adobe backend.
+
+    Also fires two concurrent conversions of the same report and records
+    how many backend jobs they started (should be one).
+    """
+    import adobe_utils
+    import converter
+
+    original = adobe_utils.convert_pdf_to_excel
+    results = {'params': {'reports': reports, 'delay': delay, 'countries': countries}}
+
+    with scratch_dir() as root, patched_paths(root) as paths:
+        template = make_acea_workbook(os.path.join(root, 'template.xlsx'), countries=countries)
+        stub = StubAdobe(template, delay)
+        adobe_utils.convert_pdf_to_excel = stub
+        try:
+            seed_reports(paths['DB_PATH'], reports, converted_every=0, pdf_dir=paths['PDF_DIR'])
+
+            start = time.perf_counter()
+            success_count, fail_count = converter.convert_pending()
+            elapsed = time.perf_counter() - start
+            results['convert_pending'] = {
+                'seconds': elapsed,
+                'per_report': elapsed / max(reports, 1),
+                'backend_seconds': stub.calls * delay,
+                'successes': success_count,
+                'failures': fail_count,
+            }
+
+            # Single-flight: two simultaneous requests for the same report
+            seed_reports(paths['DB_PATH'], 1, converted_every=0, pdf_dir=paths['PDF_DIR'])
+            conn = converter.get_db_connection()
+            report = conn.execute(
+                "SELECT * FROM reports WHERE conversion_status = 'pending' ORDER BY id DESC LIMIT 1"
+            ).fetchone()
+            conn.close()
+
+            stub.calls = 0
+            threads = [threading.Thread(target=converter.ensure_excel_exists, args=(report,))
+                       for _ in range(2)]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            results['concurrent_same_report'] = {
+                'seconds': time.perf_counter() - start,
+                'backend_jobs': stub.calls,
+            }
+        finally:
+            adobe_utils.convert_pdf_to_excel = original
+
+    return results
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+
+import time
+import sqlite3
+import datetime
+import threading
+from benchmarks.common import scratch_dir, patched_paths, seed_reports, summarize
+
+# The statements behind one request, for requests whose cost is mostly
+# per-query overhead rather than scanning
+QUERY_SETS = {
+    # /api/stats
+    'stats': [
+        'SELECT COUNT(*) FROM reports WHERE type = "PC"',
+        'SELECT COUNT(*) FROM reports WHERE type = "CV"',
+        'SELECT publish_date FROM reports WHERE type = "PC" ORDER BY publish_date DESC LIMIT 1',
+        'SELECT publish_date FROM reports WHERE type = "CV" ORDER BY publish_date DESC LIMIT 1',
+    ],
+    # /reports/<id>/preview, /api/reports/<id>/conversion
+    'report_lookup': [
+        'SELECT * FROM reports WHERE id = 17',
+    ],
+}
+
+def _request(conn, queries):
+    for sql in queries:
+        conn.execute(sql).fetchall()
+
+def _writer(db_path, stop, interval):
+    """Insert reports the way the scraper does until stopped; return the number written."""
+    written = 0
+    while not stop.is_set():
+        conn = sqlite3.connect(db_path)
+        conn.execute(
+            "INSERT INTO reports (type, title, url, created_at) VALUES ('PC', 'bench', 'bench', ?)",
+            (datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),)
+        )
+        conn.commit()
+        conn.close()
+        written += 1
+        stop.wait(interval)
+    return written
+
+def run(reports=5000, requests=500, write_interval=0.01):
+    """
+    Compare a new connection per request with the web app's reused
+    per-thread connections while a concurrent writer inserts reports.
+    """
+    import app as webapp
+    import profiling
+
+    results = {'params': {'reports': reports, 'requests': requests, 'write_interval': write_interval},
+               'queries': {}}
+
+    with scratch_dir() as root, patched_paths(root) as paths:
+        webapp.create_app()
+        seed_reports(paths['DB_PATH'], reports)
+
+        def connect_per_request(queries):
+            # What get_db_connection did before connections were reused
+            conn = profiling.connect(paths['DB_PATH'])
+            conn.row_factory = sqlite3.Row
+            _request(conn, queries)
+            conn.close()
+
+        reused = webapp.open_db_connection(read_only=True)
+        modes = {
+            'connect_per_request': connect_per_request,
+            'reused_connection': lambda queries: _request(reused, queries),
+        }
+
+        for name, queries in QUERY_SETS.items():
+            results['queries'][name] = {}
+            for mode, handle in modes.items():
+                stop = threading.Event()
+                writes = []
+                writer = threading.Thread(target=lambda: writes.append(_writer(paths['DB_PATH'], stop, write_interval)))
+                writer.start()
+
+                samples = []
+                try:
+                    for _ in range(requests):
+                        start = time.perf_counter()
+                        handle(queries)
+                        samples.append(time.perf_counter() - start)
+                finally:
+                    stop.set()
+                    writer.join()
+
+                results['queries'][name][mode] = summarize(samples)
+                results['queries'][name][mode]['concurrent_writes'] = writes[0]
+
+        reused.close()
+
+    return results
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+
+import os
+import shutil
+from benchmarks.common import scratch_dir, summarize, time_call
+from benchmarks.workbooks import make_acea_workbook
+
+def run(sizes=(30, 200, 1000, 5000), repeat=3):
+    """
+    Time extract_monthly_table and clean_monthly_table on generated
+    workbooks with an increasing number of country rows.
+
+    Each call gets a fresh copy of the workbook, since both functions
+    rewrite the file in place.
+    """
+    import excel_formatter
+
+    results = {'params': {'sizes': list(sizes), 'repeat': repeat}, 'sizes': {}}
+
+    with scratch_dir() as root:
+        for size in sizes:
+            raw = make_acea_workbook(os.path.join(root, f"raw-{size}.xlsx"), countries=size)
+            monthly = make_acea_workbook(os.path.join(root, f"monthly-{size}.xlsx"),
+                                         countries=size, monthly_sheet=True)
+            work = os.path.join(root, f"work-{size}.xlsx")
+
+            def extract():
+                shutil.copyfile(raw, work)
+                assert excel_formatter.extract_monthly_table(work)
+
+            def clean():
+                shutil.copyfile(monthly, work)
+                assert excel_formatter.clean_monthly_table(work)
+
+            results['sizes'][str(size)] = {
+                'file_bytes': os.path.getsize(raw),
+                'extract_monthly_table': summarize(time_call(extract, repeat)),
+                'clean_monthly_table': summarize(time_call(clean, repeat)),
+            }
+
+    return results
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+
+import os
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from benchmarks.common import scratch_dir, patched_paths, make_pdf
+
+class StandInServer:
+    """
+    Local stand-in for the ACEA file server.
+
+    Serves a parseable synthetic PDF for every filename in `available`, so
+    the scan's text extraction does the same work as for a real report, a
+    press release
+    listing linking to all of them at /press-releases and 404 for anything
+    else, after `latency` seconds.
+    """
+
+    def __init__(self, available, latency=0.05, pdf_size=200 * 1024):
+        self.available = set(available)
+        self.latency = latency
+        self.body = make_pdf('New car registrations by country and month', pdf_size)
+        self.listing = ''.join(
+            f'<a href="/files/{name}">{name}</a>\n' for name in sorted(self.available)
+        ).encode()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                time.sleep(server.latency)
+                if self.path == '/press-releases':
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/html')
+                    self.send_header('Content-Length', str(len(server.listing)))
+                    self.end_headers()
+                    self.wfile.write(server.listing)
+                    return
+
+                name = os.path.basename(self.path)
+                with server._lock:
+                    if name in server.available:
+                        server.hits += 1
+                    else:
+                        server.misses += 1
+
+                if name in server.available:
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'application/pdf')
+                    self.send_header('Content-Length', str(len(server.body)))
+                    self.end_headers()
+                    self.wfile.write(server.body)
+                else:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}/files/"
+
+    @property
+    def listing_url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}/press-releases"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def run(latency=0.05, hit_every=10, pdf_size=200 * 1024):
+    """
+    Time scraper.scan_for_new_reports against the stand-in server.
+
+    Every hit_every-th generated URL exists; the rest return 404. Each scan
+    mode is run on its own database twice: cold (empty database) and warm
+    (everything found already recorded). In 'guess' mode the warm scan
+    probes the misses again; in 'listing' mode it stops at the first known
+    report. Nothing is fetched from the real site.
+    """
+    import scraper
+
+    original = (scraper.FILES_BASE_URL, scraper.PRESS_RELEASES_URL, scraper.REQUEST_DELAY, scraper.SCAN_MODE)
+    urls = scraper.generate_pc_urls() + scraper.generate_cv_urls()
+    available = [os.path.basename(url) for url in urls[::hit_every]]
+
+    results = {'params': {'latency': latency, 'hit_every': hit_every,
+                          'pdf_size': pdf_size, 'candidate_urls': len(urls)}}
+
+    with StandInServer(available, latency, pdf_size) as server:
+        scraper.FILES_BASE_URL = server.base_url
+        scraper.PRESS_RELEASES_URL = server.listing_url
+        scraper.REQUEST_DELAY = 0
+        try:
+            for mode in ('guess', 'listing'):
+                scraper.SCAN_MODE = mode
+                results[mode] = {}
+                with scratch_dir() as root, patched_paths(root):
+                    scraper.init_database()
+                    for phase in ('cold', 'warm'):
+                        server.hits = server.misses = 0
+                        start = time.perf_counter()
+                        scraper.scan_for_new_reports()
+                        results[mode][phase] = {
+                            'seconds': time.perf_counter() - start,
+                            'pdf_responses': server.hits,
+                            'not_found_responses': server.misses,
+                        }
+        finally:
+            scraper.FILES_BASE_URL, scraper.PRESS_RELEASES_URL, scraper.REQUEST_DELAY, scraper.SCAN_MODE = original
+
+    return results
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import subprocess
+from benchmarks.common import summarize
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules a gunicorn worker imports on boot, and the heavy ones it should
+# only load on first use
+MODULES = ['app', 'converter', 'scraper']
+HEAVY_MODULES = ['openpyxl', 'adobe', 'requests', 'bs4', 'pypdf']
+
+# Median seconds `import app` may take before the run is marked as failed
+APP_IMPORT_BUDGET = float(os.environ.get('APP_IMPORT_BUDGET', '0.5'))
+
+SNIPPET = """
+import sys
+import json
+import time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps([elapsed, sorted(name.split('.')[0] for name in sys.modules)]))
+"""
+
+def time_import(module):
+    """
+    Import a module in a fresh interpreter.
+
+    Returns:
+        tuple: (seconds taken, heavy modules it loaded)
+    """
+    output = subprocess.run(
+        [sys.executable, '-c', SNIPPET.format(module=module)],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    elapsed, loaded = json.loads(output.strip().splitlines()[-1])
+    return elapsed, [name for name in HEAVY_MODULES if name in loaded]
+
+def run(repeat=5):
+    """
+    Measure cold import time of the web app and the modules it loads lazily,
+    and check `import app` against APP_IMPORT_BUDGET and HEAVY_MODULES.
+    """
+    results = {'params': {'repeat': repeat, 'app_import_budget': APP_IMPORT_BUDGET}, 'imports': {}}
+    app_heavy = set()
+    for module in MODULES:
+        samples = []
+        for _ in range(repeat):
+            elapsed, heavy = time_import(module)
+            samples.append(elapsed)
+            if module == 'app':
+                app_heavy.update(heavy)
+        results['imports'][module] = summarize(samples)
+
+    app_seconds = results['imports']['app']['p50']
+    results['budget'] = {
+        'app_import_seconds': app_seconds,
+        'heavy_modules_loaded': sorted(app_heavy),
+        'passed': app_seconds <= APP_IMPORT_BUDGET and not app_heavy,
+    }
+    return results
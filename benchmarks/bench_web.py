@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+import time
+import threading
+from benchmarks.common import scratch_dir, patched_paths, seed_reports, summarize
+
+ROUTES = ['/', '/reports/PC', '/api/stats']
+
+def _load(client_factory, route, requests_per_thread, threads, headers=None, expected_status=200):
+    """Issue requests from several threads and return every latency."""
+    samples = []
+    lock = threading.Lock()
+
+    def worker():
+        client = client_factory()
+        local = []
+        for _ in range(requests_per_thread):
+            start = time.perf_counter()
+            response = client.get(route, headers=headers)
+            local.append(time.perf_counter() - start)
+            assert response.status_code == expected_status, f"{route} returned {response.status_code}"
+        with lock:
+            samples.extend(local)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    wall = time.perf_counter() - start
+    return samples, wall
+
+def run(reports=5000, requests=200, threads=4):
+    """
+    Load-test the dashboard, listing and stats routes in-process on a
+    database seeded with synthetic reports, both as fresh page loads and as
+    polls revalidating the previous response with If-None-Match.
+    """
+    import app as webapp
+
+    results = {'params': {'reports': reports, 'requests': requests, 'threads': threads},
+               'routes': {}, 'conditional': {}}
+
+    with scratch_dir() as root, patched_paths(root) as paths:
+        flask_app = webapp.create_app()
+        seed_reports(paths['DB_PATH'], reports)
+
+        for route in ROUTES:
+            # Warm up templates and the SQLite page cache
+            etag = flask_app.test_client().get(route).headers.get('ETag')
+
+            per_thread = max(1, requests // threads)
+            samples, wall = _load(flask_app.test_client, route, per_thread, threads)
+            stats = summarize(samples)
+            stats['requests_per_second'] = len(samples) / wall
+            results['routes'][route] = stats
+
+            if etag:
+                samples, wall = _load(flask_app.test_client, route, per_thread, threads,
+                                      headers={'If-None-Match': etag}, expected_status=304)
+                stats = summarize(samples)
+                stats['requests_per_second'] = len(samples) / wall
+                results['conditional'][route] = stats
+
+    return results
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import time
+import shutil
+import sqlite3
+import datetime
+import tempfile
+import statistics
+from contextlib import contextmanager
+import database
+
+# Modules whose path constants get redirected to a scratch directory
+PATCHED_MODULES = ['database', 'scraper', 'converter', 'file_reaper', 'tasks', 'metrics', 'search_index', 'archive', 'data_version', 'app']
+
+# Contents of the PDFs written by seed_reports; only their existence matters
+SEED_PDF = b'%PDF-1.4\n%%EOF\n'
+
+def summarize(samples):
+    """Summarize a list of durations in seconds."""
+    ordered = sorted(samples)
+    return {
+        'count': len(ordered),
+        'min': ordered[0],
+        'mean': statistics.mean(ordered),
+        'p50': ordered[len(ordered) // 2],
+        'p95': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        'max': ordered[-1],
+    }
+
+def time_call(fn, repeat):
+    """Call fn repeat times and return the duration of each call."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+@contextmanager
+def scratch_dir():
+    """Create a temporary directory that is removed afterwards."""
+    path = tempfile.mkdtemp(prefix='acea-bench-')
+    try:
+        yield path
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+@contextmanager
+def patched_paths(root):
+    """
+    Point the data paths of the app modules at a scratch directory.
+
+    Only modules that are already imported and define the constant are
+    touched (database always is); the original values are restored on exit.
+    """
+    paths = {
+        'DB_PATH': os.path.join(root, 'database.db'),
+        'PDF_DIR': os.path.join(root, 'pdfs'),
+        'EXCEL_DIR': os.path.join(root, 'excel'),
+        'LOCK_DIR': os.path.join(root, 'locks'),
+        'ARCHIVE_DIR': os.path.join(root, 'archive'),
+        'DATA_DIR': root,
+        'LOG_FILE': os.path.join(root, 'scraper.log'),
+        'APP_LOG_FILE': os.path.join(root, 'app.log'),
+    }
+    for key in ('PDF_DIR', 'EXCEL_DIR', 'LOCK_DIR'):
+        os.makedirs(paths[key], exist_ok=True)
+
+    saved = []
+    for name in PATCHED_MODULES:
+        module = sys.modules.get(name)
+        if module is None:
+            continue
+        for key, value in paths.items():
+            if hasattr(module, key):
+                saved.append((module, key, getattr(module, key)))
+                setattr(module, key, value)
+
+    try:
+        yield paths
+    finally:
+        for module, key, value in reversed(saved):
+            setattr(module, key, value)
+
+def make_pdf(text, size=0):
+    """
+    Build a one-page PDF showing text that pypdf can parse, padded to about
+    size bytes through a string in its Info dictionary.
+    """
+    content = f"BT /F1 12 Tf 72 770 Td ({text}) Tj ET".encode()
+    padding = max(size - 700, 0)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+        b"/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Length " + str(len(content)).encode() + b" >>\nstream\n" + content + b"\nendstream",
+        b"<< /Producer (benchmarks) /Padding (" + b"0" * padding + b") >>",
+    ]
+
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        pdf += f"{offset:010d} 00000 n \n".encode()
+    pdf += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R /Info {len(objects)} 0 R >>\n".encode()
+    pdf += f"startxref\n{xref}\n%%EOF\n".encode()
+    return bytes(pdf)
+
+def seed_reports(db_path, count, converted_every=3, pdf_dir=None):
+    """
+    Fill the reports table with synthetic rows.
+
+    Every converted_every-th report is marked as already converted; 0 leaves
+    them all pending. With pdf_dir, a small PDF is written there for each
+    report, for benchmarks that read the files.
+    """
+    database.init_database()
+    now = datetime.datetime.now()
+    conn = sqlite3.connect(db_path)
+    # Continue the numbering so repeated calls don't reuse a pdf_url
+    first = conn.execute('SELECT COALESCE(MAX(id), 0) FROM reports').fetchone()[0]
+    rows = []
+    for i in range(first, first + count):
+        report_type = 'PC' if i % 4 else 'CV'
+        publish_date = (now - datetime.timedelta(days=i)).strftime('%Y-%m-%d')
+        filename = f"Press_release_bench_{report_type}_{i}.pdf"
+        converted = bool(converted_every) and (i + 1) % converted_every == 0
+        rows.append((
+            report_type,
+            f"{report_type} Report - bench {i}",
+            f"https://example.invalid/{filename}",
+            f"https://example.invalid/{filename}",
+            os.path.join(pdf_dir or '/bench/pdfs', filename),
+            publish_date,
+            now.strftime('%Y-%m-%d %H:%M:%S'),
+            f"/bench/excel/{filename.replace('.pdf', '.xlsx')}" if converted else None,
+            'converted' if converted else 'pending',
+        ))
+
+        if pdf_dir:
+            with open(os.path.join(pdf_dir, filename), 'wb') as f:
+                f.write(SEED_PDF)
+
+    conn.executemany(
+        "INSERT INTO reports (type, title, url, pdf_url, pdf_path, publish_date, created_at, excel_path, conversion_status) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        rows
+    )
+    conn.commit()
+    conn.close()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+
+import sys
+import json
+
+# Keys whose values are durations in seconds; everything else is ignored
+TIME_KEYS = {'seconds', 'per_report', 'mean', 'p50', 'p95'}
+
+def flatten(data, prefix=''):
+    """Flatten nested results into {'a.b.c': value} for the timing keys."""
+    flat = {}
+    for key, value in data.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, path))
+        elif key in TIME_KEYS and isinstance(value, (int, float)):
+            flat[path] = value
+    return flat
+
+def main():
+    """Print the timing changes between two benchmark result files."""
+    if len(sys.argv) != 3:
+        print("Usage: python -m benchmarks.compare BASELINE.json CANDIDATE.json")
+        sys.exit(2)
+
+    with open(sys.argv[1]) as f:
+        baseline = flatten(json.load(f)['benchmarks'])
+    with open(sys.argv[2]) as f:
+        candidate = flatten(json.load(f)['benchmarks'])
+
+    for key in sorted(baseline.keys() & candidate.keys()):
+        before, after = baseline[key], candidate[key]
+        change = (after - before) / before * 100 if before else 0.0
+        print(f"{key:70s} {before * 1000:10.2f}ms {after * 1000:10.2f}ms {change:+7.1f}%")
+
+if __name__ == '__main__':
+    main()
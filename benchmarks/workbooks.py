@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+import random
+import openpyxl
+
+# One value, previous-year value and % change per power source, as in the
+# ACEA press-release tables
+POWER_SOURCES = ['BEV', 'PHEV', 'HEV', 'OTHERS', 'PETROL', 'DIESEL', 'TOTAL']
+TOTAL_ROWS = ['EUROPEAN UNION', 'EFTA', 'United Kingdom', 'EU + EFTA + UK']
+
+def _table_rows(countries, rng):
+    """Yield the header and body rows of one ACEA-style table."""
+    header = ['']
+    for source in POWER_SOURCES:
+        header.extend([source, '', '% change'])
+    yield header
+
+    for name in countries + TOTAL_ROWS:
+        row = [name]
+        for _ in POWER_SOURCES:
+            current = rng.randint(0, 250000)
+            previous = rng.randint(1, 250000)
+            # Adobe returns a mix of numbers and formatted strings
+            row.append(f"{current:,}" if rng.random() < 0.3 else current)
+            row.append(previous)
+            row.append(f"{(current - previous) / previous * 100:+.1f}")
+        yield row
+
+def make_acea_workbook(path, countries=30, seed=0, monthly_sheet=False):
+    """
+    Write a workbook shaped like an Adobe export of an ACEA PC report.
+
+    The first sheet holds a MONTHLY table followed by a YEAR TO DATE table.
+    With monthly_sheet=True the MONTHLY table is also written on its own to a
+    "Monthly" sheet, as left behind by extract_monthly_table before cleaning.
+    """
+    rng = random.Random(seed)
+    names = [f"COUNTRY {i}" for i in range(countries)]
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = 'Table 1'
+    ws.append(['NEW CAR REGISTRATIONS BY MARKET AND POWER SOURCE'])
+    ws.append([])
+    ws.append(['MONTHLY'])
+    monthly = list(_table_rows(names, rng))
+    for row in monthly:
+        ws.append(row)
+    ws.append([])
+    ws.append(['YEAR TO DATE'])
+    for row in _table_rows(names, rng):
+        ws.append(row)
+
+    if monthly_sheet:
+        monthly_ws = wb.create_sheet('Monthly')
+        monthly_ws.append(['MONTHLY'])
+        for row in monthly:
+            monthly_ws.append(row)
+
+    wb.save(path)
+    return path
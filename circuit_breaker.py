@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+
+import time
+import sqlite3
+import logging
+
+# Set up logging
+logger = logging.getLogger('acea_circuit_breaker')
+
+# Constants
+DB_PATH = '/app/data/database.db'
+
+def create_table(conn):
+    """Create the table holding the state of every circuit breaker."""
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS circuit_breakers (
+        name TEXT PRIMARY KEY,
+        failures INTEGER NOT NULL DEFAULT 0,
+        open_until REAL NOT NULL DEFAULT 0
+    )
+    ''')
+
+class CircuitBreaker:
+    """
+    Stop calling a failing service until it has had time to recover.
+
+    After failure_threshold consecutive failures the circuit opens and
+    allow() returns False for reset_timeout seconds. Then a single caller is
+    let through as a trial: success closes the circuit, failure keeps it open
+    for another reset_timeout. The state lives in SQLite, so every gunicorn
+    worker and the scheduler process share it. Database errors fail open so a
+    broken breaker never blocks conversions.
+    """
+
+    def __init__(self, name, failure_threshold=3, reset_timeout=300):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+    def _connect(self):
+        return sqlite3.connect(DB_PATH, timeout=30)
+
+    def allow(self):
+        """Return True if the service may be called now."""
+        now = time.time()
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                row = conn.execute(
+                    'SELECT failures, open_until FROM circuit_breakers WHERE name = ?', (self.name,)
+                ).fetchone()
+                if row is None or row[0] < self.failure_threshold:
+                    allowed = True
+                elif now >= row[1]:
+                    # Half-open: this caller tries the service, the others keep failing fast
+                    conn.execute(
+                        'UPDATE circuit_breakers SET open_until = ? WHERE name = ?',
+                        (now + self.reset_timeout, self.name)
+                    )
+                    logger.info(f"Circuit {self.name} half-open, trying the service again")
+                    allowed = True
+                else:
+                    allowed = False
+            conn.close()
+            return allowed
+        except sqlite3.Error as e:
+            logger.error(f"Error reading circuit {self.name}: {e}")
+            return True
+
+    def is_open(self):
+        """Return True while calls are being refused."""
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                'SELECT failures, open_until FROM circuit_breakers WHERE name = ?', (self.name,)
+            ).fetchone()
+            conn.close()
+        except sqlite3.Error as e:
+            logger.error(f"Error reading circuit {self.name}: {e}")
+            return False
+        return row is not None and row[0] >= self.failure_threshold and time.time() < row[1]
+
+    def record_success(self):
+        """Close the circuit after a successful call."""
+        try:
+            conn = self._connect()
+            with conn:
+                previous = conn.execute(
+                    'SELECT failures FROM circuit_breakers WHERE name = ?', (self.name,)
+                ).fetchone()
+                conn.execute(
+                    'INSERT OR REPLACE INTO circuit_breakers (name, failures, open_until) VALUES (?, 0, 0)',
+                    (self.name,)
+                )
+            conn.close()
+            if previous and previous[0] >= self.failure_threshold:
+                logger.info(f"Circuit {self.name} closed, the service has recovered")
+        except sqlite3.Error as e:
+            logger.error(f"Error updating circuit {self.name}: {e}")
+
+    def record_failure(self):
+        """Count a failed call, opening the circuit once the threshold is reached."""
+        now = time.time()
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                row = conn.execute(
+                    'SELECT failures FROM circuit_breakers WHERE name = ?', (self.name,)
+                ).fetchone()
+                failures = (row[0] if row else 0) + 1
+                open_until = now + self.reset_timeout if failures >= self.failure_threshold else 0
+                conn.execute(
+                    'INSERT OR REPLACE INTO circuit_breakers (name, failures, open_until) VALUES (?, ?, ?)',
+                    (self.name, failures, open_until)
+                )
+            conn.close()
+            if failures == self.failure_threshold:
+                logger.warning(f"Circuit {self.name} opened after {failures} consecutive failures")
+        except sqlite3.Error as e:
+            logger.error(f"Error updating circuit {self.name}: {e}")
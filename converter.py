@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+
+import os
+import time
+import fcntl
+import random
+import sqlite3
+import logging
+import datetime
+import tempfile
+from contextlib import contextmanager
+import adobe_utils
+import archive
+import data_version
+import excel_formatter
+import previews
+import profiling
+
+# Set up logging
+logger = logging.getLogger('acea_converter')
+
+# Constants
+DB_PATH = '/app/data/database.db'
+EXCEL_DIR = '/app/data/excel'
+LOCK_DIR = '/app/data/locks'
+CONVERSION_WAIT_TIMEOUT = 300  # seconds to wait for another process's conversion
+# Failed conversions are retried after 1, 2, 4, ... minutes, up to 6 hours
+# apart, and given up after MAX_ATTEMPTS
+RETRY_BASE_SECONDS = 60
+RETRY_MAX_SECONDS = 6 * 3600
+MAX_ATTEMPTS = 8
+
+# Ensure directories exist
+os.makedirs(EXCEL_DIR, exist_ok=True)
+os.makedirs(LOCK_DIR, exist_ok=True)
+
+def get_db_connection():
+    """Create a database connection."""
+    conn = profiling.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+def convert_pdf_to_excel(pdf_path, excel_path):
+    """
+    Convert a PDF to Excel.
+    """
+    try:
+        logger.info(f"Converting PDF to Excel: {pdf_path}")
+        success = adobe_utils.convert_pdf_to_excel(pdf_path, excel_path)
+
+        if success:
+            logger.info(f"Conversion successful: {excel_path}")
+            return True
+        else:
+            logger.error(f"PDF to Excel conversion failed for: {pdf_path}")
+            return False
+
+    except adobe_utils.ServiceUnavailable:
+        raise
+    except Exception as e:
+        logger.error(f"Error in PDF to Excel conversion: {e}")
+        return False
+
+def get_excel_path(pdf_path):
+    """Get the Excel path for a PDF."""
+    base_name = os.path.basename(pdf_path).replace('.pdf', '.xlsx')
+    return os.path.join(EXCEL_DIR, base_name)
+
+def set_conversion_status(report_id, status, excel_path=None):
+    """Record the conversion state of a report in the database."""
+    converted_at = None
+    if status == 'converted':
+        converted_at = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    conn = get_db_connection()
+    conn.execute(
+        'UPDATE reports SET conversion_status = ?, excel_path = ?, converted_at = ? WHERE id = ?',
+        (status, excel_path, converted_at, report_id)
+    )
+    # Finished conversions leave the retry queue
+    if status in ('converted', 'failed'):
+        conn.execute('DELETE FROM conversion_queue WHERE report_id = ?', (report_id,))
+    data_version.bump(conn)
+    conn.commit()
+    conn.close()
+
+def retry_delay(attempts):
+    """Exponential backoff with jitter, in seconds, after a number of failed attempts."""
+    delay = min(RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0), RETRY_MAX_SECONDS)
+    return delay * random.uniform(0.9, 1.1)
+
+def queue_conversion(report_id, error, attempted=True):
+    """
+    Put a report in the retry queue for the scheduler process.
+
+    attempted is False when Adobe wasn't called at all because the circuit
+    breaker is open; such deferrals don't count towards MAX_ATTEMPTS.
+
+    Returns:
+        str: The new conversion status, queued or failed
+    """
+    conn = get_db_connection()
+    row = conn.execute('SELECT attempts FROM conversion_queue WHERE report_id = ?', (report_id,)).fetchone()
+    attempts = (row['attempts'] if row else 0) + (1 if attempted else 0)
+    conn.close()
+
+    if attempts >= MAX_ATTEMPTS:
+        logger.error(f"Giving up on converting report {report_id} after {attempts} attempts: {error}")
+        set_conversion_status(report_id, 'failed')
+        return 'failed'
+
+    next_attempt = datetime.datetime.now() + datetime.timedelta(seconds=retry_delay(attempts) if attempted else 0)
+    conn = get_db_connection()
+    conn.execute(
+        'INSERT OR REPLACE INTO conversion_queue (report_id, attempts, next_attempt_at, last_error) VALUES (?, ?, ?, ?)',
+        (report_id, attempts, next_attempt.strftime('%Y-%m-%d %H:%M:%S'), error)
+    )
+    conn.execute("UPDATE reports SET conversion_status = 'queued' WHERE id = ?", (report_id,))
+    data_version.bump(conn)
+    conn.commit()
+    conn.close()
+
+    logger.info(f"Queued conversion of report {report_id} for {next_attempt:%Y-%m-%d %H:%M:%S} ({error})")
+    return 'queued'
+
+def get_queue_entry(report_id):
+    """Fetch the retry queue entry of a report, if it has one."""
+    conn = get_db_connection()
+    entry = conn.execute('SELECT * FROM conversion_queue WHERE report_id = ?', (report_id,)).fetchone()
+    conn.close()
+    return entry
+
+def retry_not_due(report):
+    """Return True while a queued report is waiting out its retry backoff."""
+    if report['conversion_status'] != 'queued':
+        return False
+    entry = get_queue_entry(report['id'])
+    return entry is not None and entry['next_attempt_at'] > datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+def get_report(report_id):
+    """Fetch a single report row by ID."""
+    conn = get_db_connection()
+    report = conn.execute('SELECT * FROM reports WHERE id = ?', (report_id,)).fetchone()
+    conn.close()
+    return report
+
+@contextmanager
+def conversion_lock(report_id, timeout=CONVERSION_WAIT_TIMEOUT):
+    """
+    Hold the cross-process conversion lock for a report.
+
+    The lock is an flock on a per-report file, so it is shared by all gunicorn
+    workers and the scheduler process, and released by the kernel if the
+    holder dies mid-conversion.
+
+    Yields:
+        bool: True if the lock was acquired, False if the wait timed out
+    """
+    lock_path = os.path.join(LOCK_DIR, f"report-{report_id}.lock")
+    deadline = time.monotonic() + timeout
+
+    with open(lock_path, 'w') as lock_file:
+        while True:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    yield False
+                    return
+                time.sleep(0.5)
+
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def convert_report_to_excel(report):
+    """
+    Convert a report's PDF to Excel and record the outcome.
+
+    The workbook is built under a temporary name and renamed into place once
+    complete, so readers never see a half-written file. Must be called while
+    holding the report's conversion lock.
+
+    Failures, and conversions deferred while the Adobe circuit breaker is
+    open, go to the retry queue.
+
+    Returns:
+        str: Path to the Excel file, or None if the conversion failed
+    """
+    excel_path = get_excel_path(report['pdf_path'])
+    set_conversion_status(report['id'], 'in_progress')
+    previews.invalidate(excel_path)
+    
+    # Old PDFs may have been moved to the compressed archive
+    if not archive.restore(report['pdf_path']):
+        logger.error(f"PDF not found for report {report['id']}: {report['pdf_path']}")
+        set_conversion_status(report['id'], 'failed')
+        return None
+
+    with profiling.profile(f"convert-{report['id']}", profiling.enabled('convert')):
+        # openpyxl refuses to open files without an .xlsx extension
+        fd, tmp_path = tempfile.mkstemp(dir=EXCEL_DIR, prefix=f".{os.path.basename(excel_path)}.", suffix='.xlsx')
+        os.close(fd)
+
+        try:
+            try:
+                converted = convert_pdf_to_excel(report['pdf_path'], tmp_path)
+            except adobe_utils.ServiceUnavailable as e:
+                queue_conversion(report['id'], str(e), attempted=False)
+                return None
+            if not converted:
+                queue_conversion(report['id'], 'Adobe conversion failed')
+                return None
+
+            # Add the monthly table for PC reports
+            if report['type'] == 'PC':
+                excel_formatter.extract_monthly_table(tmp_path, previews.preview_path(excel_path))
+
+            os.replace(tmp_path, excel_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    set_conversion_status(report['id'], 'converted', excel_path)
+    return excel_path
+
+def ensure_excel_exists(report):
+    """
+    Ensure Excel file exists for a report, converting if needed.
+
+    If another process is already converting the same report, wait for it to
+    finish and reuse its result instead of starting a second Adobe job.
+    Queued reports are left alone until their next retry is due.
+    """
+    if report['conversion_status'] == 'converted':
+        return report['excel_path']
+
+    with conversion_lock(report['id']) as acquired:
+        if not acquired:
+            logger.error(f"Timed out waiting for conversion of report {report['id']}")
+            return None
+
+        # Another process may have finished the conversion while we waited
+        report = get_report(report['id'])
+        if report['conversion_status'] == 'converted':
+            return report['excel_path']
+        if retry_not_due(report):
+            logger.info(f"Conversion of report {report['id']} is queued for a later retry")
+            return None
+
+        logger.info(f"Converting PDF to Excel: {report['pdf_path']}")
+        return convert_report_to_excel(report)
+
+def convert_pending():
+    """
+    Convert every report that doesn't have an Excel file yet.
+
+    Returns:
+        tuple: (success_count, fail_count)
+    """
+    conn = get_db_connection()
+    # in_progress rows are included so conversions abandoned by a dead
+    # process get picked up; live ones are serialised by the lock. Queued
+    # ones wait for their retry to be due.
+    reports = conn.execute(
+        "SELECT * FROM reports WHERE conversion_status IN ('pending', 'queued', 'failed', 'in_progress') "
+        "AND id NOT IN (SELECT report_id FROM conversion_queue WHERE next_attempt_at > ?)",
+        (datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),)
+    ).fetchall()
+    conn.close()
+
+    logger.info(f"Converting {len(reports)} pending reports")
+    success_count = 0
+    fail_count = 0
+
+    for report in reports:
+        if ensure_excel_exists(report):
+            success_count += 1
+        else:
+            fail_count += 1
+
+    logger.info(f"Converted {success_count} PDFs to Excel, {fail_count} failed")
+    return success_count, fail_count
+
+def drain_queue():
+    """
+    Retry the queued conversions that are due, oldest first.
+
+    Draining stops as soon as the circuit breaker opens, leaving the rest of
+    the queue for when the service has recovered.
+
+    Returns:
+        tuple: (success_count, remaining_count)
+    """
+    conn = get_db_connection()
+    due = conn.execute(
+        'SELECT r.* FROM conversion_queue q JOIN reports r ON r.id = q.report_id '
+        'WHERE q.next_attempt_at <= ? ORDER BY q.next_attempt_at',
+        (datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),)
+    ).fetchall()
+    conn.close()
+
+    success_count = 0
+    for index, report in enumerate(due):
+        if adobe_utils.ADOBE_BREAKER.is_open():
+            logger.info(f"Adobe circuit open, leaving {len(due) - index} conversions queued")
+            return success_count, len(due) - index
+        if ensure_excel_exists(report):
+            success_count += 1
+
+    if due:
+        logger.info(f"Retried {len(due)} queued conversions, {success_count} succeeded")
+    return success_count, 0
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+import time
+import sqlite3
+import logging
+
+# Set up logging
+logger = logging.getLogger('acea_data_version')
+
+# Constants
+DB_PATH = '/app/data/database.db'
+
+def create_table(conn):
+    """Create the single-row table holding the data version."""
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS data_version (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL,
+        updated_at REAL NOT NULL
+    )
+    ''')
+    conn.execute('INSERT OR IGNORE INTO data_version (id, version, updated_at) VALUES (1, 1, ?)', (time.time(),))
+
+def bump(conn=None):
+    """
+    Record that the reports shown by the web app have changed.
+
+    Pass the connection of the transaction that made the change, so the new
+    version becomes visible together with the data. Without one the bump is
+    committed on its own connection.
+    """
+    if conn is not None:
+        conn.execute('UPDATE data_version SET version = version + 1, updated_at = ? WHERE id = 1', (time.time(),))
+        return
+
+    try:
+        conn = sqlite3.connect(DB_PATH, timeout=30)
+        with conn:
+            bump(conn)
+        conn.close()
+    except sqlite3.Error as e:
+        logger.error(f"Error updating the data version: {e}")
+
+def current(conn):
+    """
+    Return the data version and the time it last changed.
+
+    Returns:
+        tuple: (version, updated_at) with updated_at as a Unix timestamp
+    """
+    row = conn.execute('SELECT version, updated_at FROM data_version WHERE id = 1').fetchone()
+    if row is None:
+        return 0, 0.0
+    return row[0], row[1]
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+
+import os
+import sqlite3
+import logging
+import datetime
+import archive
+import circuit_breaker
+import data_version
+import search_index
+
+# Set up logging
+logger = logging.getLogger('acea_database')
+
+# Constants
+DB_PATH = '/app/data/database.db'
+EXCEL_DIR = '/app/data/excel'
+
+def init_database():
+    """
+    Initialize the SQLite database if it doesn't exist.
+    
+    Every gunicorn worker and the scheduler process call this at start-up,
+    so the migrations take the write lock and check again before changing
+    anything.
+    """
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    # WAL lets the web app read while the scheduler or scraper writes; the
+    # mode is stored in the database file, so setting it once is enough
+    conn.execute('PRAGMA journal_mode=WAL')
+    cursor = conn.cursor()
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS reports (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        type TEXT NOT NULL,
+        title TEXT NOT NULL,
+        url TEXT NOT NULL,
+        pdf_url TEXT,
+        pdf_path TEXT,
+        publish_date TEXT,
+        created_at TEXT NOT NULL,
+        excel_path TEXT,
+        conversion_status TEXT NOT NULL DEFAULT 'pending',
+        converted_at TEXT
+    )
+    ''')
+    migrate_conversion_columns(conn)
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_reports_conversion_status ON reports (conversion_status)')
+    # Serves the per-type listings, latest reports and counts without a table scan
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_reports_type_publish_date ON reports (type, publish_date)')
+    
+    # Work requested from the web app and carried out by the scheduler process
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS tasks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        status TEXT NOT NULL,
+        requested_at TEXT NOT NULL,
+        started_at TEXT,
+        finished_at TEXT,
+        message TEXT
+    )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status)')
+    
+    # Conversions waiting to be retried by the scheduler process
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS conversion_queue (
+        report_id INTEGER PRIMARY KEY,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        next_attempt_at TEXT NOT NULL,
+        last_error TEXT
+    )
+    ''')
+    circuit_breaker.create_table(conn)
+    
+    # Bumped with every change to the reports, for the web app's ETags and page cache
+    data_version.create_table(conn)
+    
+    search_index.create_index(conn)
+    archive.create_index(conn)
+    
+    # Candidate URLs already tried by backfill.py, so an interrupted run resumes
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS backfill_progress (
+        url TEXT PRIMARY KEY,
+        status TEXT NOT NULL,
+        checked_at TEXT NOT NULL
+    )
+    ''')
+    conn.commit()
+    
+    # A PDF is recorded once, even if a scan and a release probe race for it
+    create_pdf_url_index(conn)
+    conn.close()
+    logger.info("Database initialized")
+
+def create_pdf_url_index(conn):
+    """
+    Make reports.pdf_url unique, first deleting the extra reports on
+    databases where concurrent scans inserted a report twice.
+    """
+    index_exists = "SELECT 1 FROM sqlite_master WHERE name = 'idx_reports_pdf_url'"
+    if conn.execute(index_exists).fetchone():
+        return
+    
+    # Another process may have created the index while we waited for the lock
+    conn.execute('BEGIN IMMEDIATE')
+    if conn.execute(index_exists).fetchone():
+        conn.rollback()
+        return
+    
+    remove_duplicate_reports(conn)
+    conn.execute('CREATE UNIQUE INDEX idx_reports_pdf_url ON reports (pdf_url)')
+    conn.commit()
+
+def remove_duplicate_reports(conn):
+    """
+    Delete all but one report of each PDF URL. The caller commits.
+    
+    A converted report is kept over the others, so its workbook stays
+    referenced; otherwise the first one is. The duplicates share the kept
+    report's PDF, so no files are removed.
+    """
+    duplicate_ids = [row[0] for row in conn.execute('''
+        SELECT id FROM (
+            SELECT id, ROW_NUMBER() OVER (
+                PARTITION BY pdf_url ORDER BY conversion_status = 'converted' DESC, id
+            ) AS position
+            FROM reports WHERE pdf_url IS NOT NULL
+        ) WHERE position > 1
+    ''')]
+    if not duplicate_ids:
+        return
+    
+    logger.warning(f"Removing {len(duplicate_ids)} duplicate reports")
+    placeholders = ','.join(['?'] * len(duplicate_ids))
+    conn.execute(f'DELETE FROM reports WHERE id IN ({placeholders})', duplicate_ids)
+    conn.execute(f'DELETE FROM conversion_queue WHERE report_id IN ({placeholders})', duplicate_ids)
+    search_index.remove_reports(conn, duplicate_ids)
+    data_version.bump(conn)
+
+def migrate_conversion_columns(conn):
+    """
+    Add the conversion tracking columns to databases created before they existed.
+    
+    Reports whose Excel file is already on disk are marked as converted so the
+    web app does not have to check the filesystem for them again.
+    """
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(reports)')]
+    if 'conversion_status' in columns:
+        return
+    
+    # Another process may have added the columns while we waited for the lock
+    conn.execute('BEGIN IMMEDIATE')
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(reports)')]
+    if 'conversion_status' in columns:
+        conn.rollback()
+        return
+    
+    logger.info("Adding conversion tracking columns to reports table")
+    conn.execute('ALTER TABLE reports ADD COLUMN excel_path TEXT')
+    conn.execute("ALTER TABLE reports ADD COLUMN conversion_status TEXT NOT NULL DEFAULT 'pending'")
+    conn.execute('ALTER TABLE reports ADD COLUMN converted_at TEXT')
+    
+    # One-off sync with the files converted before the columns existed
+    for report_id, pdf_path in conn.execute('SELECT id, pdf_path FROM reports').fetchall():
+        if not pdf_path:
+            continue
+        excel_path = os.path.join(EXCEL_DIR, os.path.basename(pdf_path).replace('.pdf', '.xlsx'))
+        if os.path.exists(excel_path):
+            modified = datetime.datetime.fromtimestamp(os.path.getmtime(excel_path))
+            conn.execute(
+                "UPDATE reports SET excel_path = ?, conversion_status = 'converted', converted_at = ? WHERE id = ?",
+                (excel_path, modified.strftime('%Y-%m-%d %H:%M:%S'), report_id)
+            )
+    conn.commit()
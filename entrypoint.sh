@@ -50,9 +50,11 @@ EOL
 EOL
 fi
 
-# Start cron service
-service cron start
-echo "Started cron service"
+# Metrics from every process (web workers, scheduler, scraper runs) are
+# written here and aggregated by /metrics; start each container clean
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/acea-metrics}
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
 
 # Initialize database if it doesn't exist
 if [ ! -s /app/data/database.db ]; then
@@ -69,6 +71,10 @@ env
 echo "Python packages:"
 pip list
 
+# Scans and conversions run in their own process, not in the web workers
+echo "Starting scheduler process..."
+python /app/worker.py &
+
 echo "Starting web application..."
 # Start with debug mode for troubleshooting
-exec gunicorn --bind 0.0.0.0:9734 --workers 2 --threads 4 --timeout 120 --log-level debug --access-logfile - --error-logfile - app:app
\ No newline at end of file
+exec gunicorn --bind 0.0.0.0:9734 --workers ${WEB_WORKERS:-2} --threads ${WEB_THREADS:-4} --timeout 120 --log-level debug --access-logfile - --error-logfile - "app:create_app()"
\ No newline at end of file
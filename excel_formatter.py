@@ -6,6 +6,8 @@ import openpyxl
 from openpyxl.styles import Font, Alignment
 from copy import copy
 from openpyxl.utils import get_column_letter, column_index_from_string
+import metrics
+import previews
 
 # Set up logging
 logger = logging.getLogger('excel_formatter')
@@ -23,7 +25,8 @@ def format_excel_numbers(excel_path):
         logger.info(f"Post-processing Excel file: {excel_path}")
         
         # Load the workbook
-        workbook = openpyxl.load_workbook(excel_path)
+        with metrics.timed(metrics.EXCEL_IO_DURATION, operation='load'):
+            workbook = openpyxl.load_workbook(excel_path)
         
         # Regex pattern to identify numbers
         number_pattern = re.compile(r'^-?\d{1,3}(,\d{3})*(\.\d+)?$|^-?\d+(\.\d+)?$')
@@ -63,7 +66,8 @@ def format_excel_numbers(excel_path):
                         cell.number_format = '#,##0.00'
         
         # Save the workbook
-        workbook.save(excel_path)
+        with metrics.timed(metrics.EXCEL_IO_DURATION, operation='save'):
+            workbook.save(excel_path)
         logger.info(f"Successfully formatted Excel file: {excel_path}")
         return True
         
@@ -71,10 +75,16 @@ def format_excel_numbers(excel_path):
         logger.error(f"Error formatting Excel file: {e}")
         return False
 
-def extract_monthly_table(excel_path):
-    """Extract the MONTHLY section to a new worksheet in the same Excel file."""
+def extract_monthly_table(excel_path, preview_path=None):
+    """
+    Extract the MONTHLY section to a new worksheet in the same Excel file.
+    
+    If preview_path is given, the cleaned table is also cached there for
+    the web preview, or an empty one if no monthly table was found.
+    """
     try:
-        wb = openpyxl.load_workbook(excel_path)
+        with metrics.timed(metrics.EXCEL_IO_DURATION, operation='load'):
+            wb = openpyxl.load_workbook(excel_path)
         
         # Create a new worksheet
         if "Monthly" in wb.sheetnames:
@@ -135,20 +145,24 @@ def extract_monthly_table(excel_path):
                         max_length = max(max_length, cell_length)
                 monthly_ws.column_dimensions[column_letter].width = max_length + 4
             
-            wb.save(excel_path)
+            with metrics.timed(metrics.EXCEL_IO_DURATION, operation='save'):
+                wb.save(excel_path)
             
             # After extracting, clean the table
-            clean_monthly_table(excel_path)
+            clean_monthly_table(excel_path, preview_path=preview_path)
             
             return True
         
+        # Remember that there is nothing to preview
+        if preview_path:
+            previews.save([], preview_path)
         return False
         
     except Exception as e:
         logger.error(f"Error extracting monthly table: {e}")
         return False
 
-def clean_monthly_table(excel_path, sheet_name="Monthly"):
+def clean_monthly_table(excel_path, sheet_name="Monthly", preview_path=None):
     """
     Clean up the Monthly Excel table according to specific requirements:
     1. Delete all empty columns
@@ -159,13 +173,15 @@ def clean_monthly_table(excel_path, sheet_name="Monthly"):
     Args:
         excel_path (str): Path to the Excel file
         sheet_name (str): Name of the worksheet to clean
+        preview_path (str): Where to cache the cleaned table for the web preview
     
     Returns:
         bool: True if cleaning was successful, False otherwise
     """
     try:
         # Load the workbook
-        wb = openpyxl.load_workbook(excel_path)
+        with metrics.timed(metrics.EXCEL_IO_DURATION, operation='load'):
+            wb = openpyxl.load_workbook(excel_path)
         
         if sheet_name not in wb.sheetnames:
             logger.error(f"Sheet '{sheet_name}' not found")
@@ -188,8 +204,12 @@ def clean_monthly_table(excel_path, sheet_name="Monthly"):
         empty_rows_except_column_a(ws, special_rows)
         
         # Save the workbook
-        wb.save(excel_path)
+        with metrics.timed(metrics.EXCEL_IO_DURATION, operation='save'):
+            wb.save(excel_path)
         logger.info(f"Successfully cleaned Excel file: {excel_path}")
+        
+        if preview_path:
+            previews.save(previews.sheet_rows(ws), preview_path)
         return True
         
     except Exception as e:
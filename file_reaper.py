@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+
+import os
+import time
+import queue
+import logging
+import sqlite3
+import threading
+import archive
+import previews
+
+# Set up logging
+logger = logging.getLogger('file_reaper')
+
+# Constants
+DB_PATH = '/app/data/database.db'
+PDF_DIR = '/app/data/pdfs'
+EXCEL_DIR = '/app/data/excel'
+# Files younger than this are never treated as orphans: the scraper writes the
+# PDF before inserting its row, and conversions build workbooks under a temp name
+ORPHAN_MIN_AGE = 3600
+
+_queue = queue.Queue()
+_thread = None
+_thread_lock = threading.Lock()
+
+def schedule_removal(paths):
+    """Queue files for deletion by the background reaper thread."""
+    start()
+    _queue.put(list(paths))
+
+def start():
+    """Start the reaper thread if it isn't already running in this process."""
+    global _thread
+    with _thread_lock:
+        if _thread is None or not _thread.is_alive():
+            _thread = threading.Thread(target=_run, name='file-reaper', daemon=True)
+            _thread.start()
+
+def _run():
+    """Delete queued files, then sweep for orphans once the queue is drained."""
+    while True:
+        paths = _queue.get()
+
+        # Coalesce bursts of deletions into a single sweep
+        while True:
+            try:
+                paths.extend(_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        try:
+            remove_files(paths)
+            sweep_orphans()
+        except Exception as e:
+            logger.error(f"Error in file reaper: {e}")
+
+def remove_files(paths):
+    """Delete the given files, ignoring ones that are already gone."""
+    # Files of old reports may only exist in the archive
+    archive.forget(paths)
+    
+    for path in paths:
+        try:
+            os.remove(path)
+            logger.info(f"Deleted file: {path}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Error deleting file {path}: {e}")
+
+def sweep_orphans(min_age=ORPHAN_MIN_AGE):
+    """
+    Delete PDFs and workbooks that no report row refers to.
+
+    Returns:
+        int: Number of files removed
+    """
+    conn = sqlite3.connect(DB_PATH)
+    referenced = set()
+    for pdf_path, excel_path in conn.execute('SELECT pdf_path, excel_path FROM reports'):
+        if pdf_path:
+            referenced.add(os.path.basename(pdf_path))
+        if excel_path:
+            referenced.add(os.path.basename(excel_path))
+    conn.close()
+
+    cutoff = time.time() - min_age
+    removed = 0
+
+    for directory in (PDF_DIR, EXCEL_DIR):
+        try:
+            entries = list(os.scandir(directory))
+        except FileNotFoundError:
+            continue
+
+        for entry in entries:
+            if not entry.is_file() or entry.name in referenced:
+                continue
+            # Preview caches live as long as their workbook
+            if entry.name.endswith(previews.PREVIEW_SUFFIX) and previews.workbook_name(entry.name) in referenced:
+                continue
+            try:
+                if entry.stat().st_mtime > cutoff:
+                    continue
+                os.remove(entry.path)
+                removed += 1
+                logger.info(f"Deleted orphan file: {entry.path}")
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.error(f"Error deleting orphan file {entry.path}: {e}")
+
+    return removed
@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+
+import os
+
+# Loaded automatically by gunicorn from the working directory (/app)
+
+def child_exit(server, worker):
+    """Drop a dead worker's live gauge samples from the shared metrics directory."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
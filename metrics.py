@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+import os
+import time
+import sqlite3
+import logging
+from contextlib import contextmanager
+from prometheus_client import Histogram, CollectorRegistry, REGISTRY, generate_latest, multiprocess
+from prometheus_client import CONTENT_TYPE_LATEST
+from prometheus_client.core import GaugeMetricFamily
+
+# Set up logging
+logger = logging.getLogger('acea_metrics')
+
+# Constants
+DB_PATH = '/app/data/database.db'
+
+# When PROMETHEUS_MULTIPROC_DIR is set (see entrypoint.sh) every process -
+# gunicorn workers, the scheduler, one-off scraper runs - writes its samples
+# there and /metrics aggregates them.
+MULTIPROC_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+
+HTTP_REQUEST_DURATION = Histogram(
+    'acea_http_request_duration_seconds',
+    'Web request latency by route',
+    ['route', 'method', 'status']
+)
+PROBE_DURATION = Histogram(
+    'acea_scraper_probe_duration_seconds',
+    'Latency of PDF probes in download_pdf by HTTP status',
+    ['status'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+ADOBE_PHASE_DURATION = Histogram(
+    'acea_adobe_phase_duration_seconds',
+    'Adobe PDF Services export job phases',
+    ['phase'],
+    buckets=(0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+)
+EXCEL_IO_DURATION = Histogram(
+    'acea_excel_io_duration_seconds',
+    'openpyxl workbook load and save times in excel_formatter',
+    ['operation'],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+
+@contextmanager
+def timed(histogram, **labels):
+    """Observe the duration of the block on a labelled histogram."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.labels(**labels).observe(time.perf_counter() - start)
+
+class DatabaseCollector:
+    """Gauges read from the database at scrape time, so they need no aggregation."""
+
+    def collect(self):
+        reports = GaugeMetricFamily('acea_reports', 'Reports in the database', labels=['type'])
+        conversions = GaugeMetricFamily(
+            'acea_reports_by_conversion_status', 'Reports by Excel conversion state', labels=['status']
+        )
+        queue_depth = GaugeMetricFamily(
+            'acea_task_queue_depth', 'Task requests waiting for or held by the scheduler', labels=['status']
+        )
+        retry_queue = GaugeMetricFamily('acea_conversion_retry_queue', 'Conversions waiting to be retried')
+        circuits = GaugeMetricFamily('acea_circuit_open', 'Whether calls to a service are being refused', labels=['name'])
+
+        try:
+            conn = sqlite3.connect(DB_PATH)
+            for report_type, count in conn.execute('SELECT type, COUNT(*) FROM reports GROUP BY type'):
+                reports.add_metric([report_type], count)
+            for status, count in conn.execute(
+                'SELECT conversion_status, COUNT(*) FROM reports GROUP BY conversion_status'
+            ):
+                conversions.add_metric([status], count)
+            for status, count in conn.execute(
+                "SELECT status, COUNT(*) FROM tasks WHERE status IN ('pending', 'running') GROUP BY status"
+            ):
+                queue_depth.add_metric([status], count)
+            retry_queue.add_metric([], conn.execute('SELECT COUNT(*) FROM conversion_queue').fetchone()[0])
+            for name, open_until in conn.execute('SELECT name, open_until FROM circuit_breakers'):
+                circuits.add_metric([name], 1 if open_until > time.time() else 0)
+            conn.close()
+        except sqlite3.Error as e:
+            logger.error(f"Error collecting database metrics: {e}")
+
+        yield reports
+        yield conversions
+        yield queue_depth
+        yield retry_queue
+        yield circuits
+
+_database_registry = CollectorRegistry()
+_database_registry.register(DatabaseCollector())
+
+def generate():
+    """
+    Render all metrics in the Prometheus text format.
+
+    Returns:
+        tuple: (body, content_type)
+    """
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    return generate_latest(registry) + generate_latest(_database_registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+import io
+import os
+import json
+import logging
+import datetime
+import tempfile
+import archive
+
+# Set up logging
+logger = logging.getLogger('acea_previews')
+
+# Constants
+PREVIEW_SUFFIX = '.preview.json'
+PREVIEW_SHEET = 'Monthly'
+
+def preview_path(excel_path):
+    """Path of the preview cache kept next to a workbook."""
+    return os.path.splitext(excel_path)[0] + PREVIEW_SUFFIX
+
+def workbook_name(preview_name):
+    """Name of the workbook a preview cache file belongs to."""
+    return preview_name[:-len(PREVIEW_SUFFIX)] + '.xlsx'
+
+def display_value(cell):
+    """Format a cell value the way Excel would show it in the Monthly table."""
+    value = cell.value
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return str(value).upper()
+    if isinstance(value, (int, float)):
+        if '%' in (cell.number_format or ''):
+            return f"{value:.1%}"
+        if isinstance(value, float) and not value.is_integer():
+            return f"{value:,.1f}"
+        return f"{int(value):,}"
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.strftime('%Y-%m-%d')
+    return str(value).strip()
+
+def sheet_rows(worksheet):
+    """
+    Turn a worksheet into rows of display strings, without trailing empty
+    rows or columns.
+
+    Returns:
+        list: One list of strings per row
+    """
+    rows = [[display_value(cell) for cell in row] for row in worksheet.iter_rows()]
+    while rows and not any(rows[-1]):
+        rows.pop()
+
+    width = max((max((i + 1 for i, value in enumerate(row) if value), default=0) for row in rows), default=0)
+    return [row[:width] + [''] * (width - len(row)) for row in rows]
+
+def save(rows, path):
+    """Write a preview cache atomically, so readers never see a partial file."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=f".{os.path.basename(path)}.")
+    with os.fdopen(fd, 'w') as f:
+        json.dump({'sheet': PREVIEW_SHEET, 'rows': rows}, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+def load(excel_path):
+    """
+    Read the cached preview of a workbook.
+
+    Returns:
+        list: Rows of display strings, empty if the workbook has no Monthly
+        table, or None if there is no cache
+    """
+    try:
+        with open(preview_path(excel_path)) as f:
+            return json.load(f)['rows']
+    except FileNotFoundError:
+        return None
+    except (ValueError, KeyError) as e:
+        logger.error(f"Ignoring unreadable preview for {excel_path}: {e}")
+        return None
+
+def invalidate(excel_path):
+    """Remove the preview of a workbook that is about to be regenerated."""
+    try:
+        os.remove(preview_path(excel_path))
+    except FileNotFoundError:
+        pass
+
+def build(excel_path):
+    """
+    Create the preview cache of a workbook converted before previews existed.
+
+    A workbook without a Monthly sheet gets an empty cache, so it is only
+    opened with openpyxl once.
+
+    Returns:
+        list: Rows of display strings, empty if the workbook has no Monthly
+        sheet, or None if the workbook is missing
+    """
+    # Only loaded for the first preview of an old workbook
+    import openpyxl
+
+    data = archive.read(excel_path)
+    if data is None:
+        return None
+
+    wb = openpyxl.load_workbook(io.BytesIO(data), read_only=True)
+    try:
+        rows = sheet_rows(wb[PREVIEW_SHEET]) if PREVIEW_SHEET in wb.sheetnames else []
+    finally:
+        wb.close()
+
+    save(rows, preview_path(excel_path))
+    logger.info(f"Built preview cache for {excel_path}")
+    return rows
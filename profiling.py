@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+
+import io
+import os
+import re
+import time
+import pstats
+import sqlite3
+import logging
+import datetime
+import cProfile
+from contextlib import contextmanager
+
+# Set up logging
+logger = logging.getLogger('acea_profiling')
+
+# Constants
+PROFILE_DIR = '/app/logs/profiles'
+MAX_PROFILES = 200
+
+# Comma-separated targets to profile on every run: requests, scan, convert
+# (or all). Empty by default, in which case the hooks cost one set lookup.
+PROFILE_TARGETS = {t.strip() for t in os.environ.get('PROFILE', '').split(',') if t.strip()}
+# Secret that enables profiling for a single request via ?profile=<token>
+# and unlocks the /profiles pages
+PROFILE_TOKEN = os.environ.get('PROFILE_TOKEN', '')
+# Statements slower than this are logged; 0 turns SQL timing off
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', '100'))
+
+def enabled(target):
+    """Return True if every run of the given target should be profiled."""
+    return target in PROFILE_TARGETS or 'all' in PROFILE_TARGETS
+
+@contextmanager
+def profile(name, active=True):
+    """
+    Run the block under cProfile and save the result to PROFILE_DIR.
+
+    Two files are written per run: a .prof file for pstats/snakeviz and a
+    .txt summary of the top functions by cumulative time.
+    """
+    if not active:
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    started = datetime.datetime.now()
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        try:
+            save_profile(profiler, name, started, time.perf_counter() - start)
+        except Exception as e:
+            logger.error(f"Error saving profile for {name}: {e}")
+
+def save_profile(profiler, name, started, elapsed):
+    """Write a profile and its text summary, pruning the oldest profiles."""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', name).strip('_')[:80] or 'profile'
+    base = os.path.join(PROFILE_DIR, f"{started.strftime('%Y%m%d-%H%M%S-%f')}-{slug}")
+
+    profiler.dump_stats(f"{base}.prof")
+
+    summary = io.StringIO()
+    summary.write(f"{name}\nStarted {started.isoformat()} - {elapsed * 1000:.1f} ms\n\n")
+    pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(40)
+    with open(f"{base}.txt", 'w') as f:
+        f.write(summary.getvalue())
+
+    logger.info(f"Saved profile {base}.prof ({elapsed * 1000:.1f} ms)")
+
+    profiles = sorted(list_profiles(), key=lambda p: p['name'])
+    for old in profiles[:-MAX_PROFILES]:
+        for ext in ('.prof', '.txt'):
+            try:
+                os.remove(os.path.join(PROFILE_DIR, old['name'] + ext))
+            except FileNotFoundError:
+                pass
+
+def list_profiles():
+    """
+    List saved profiles, newest first.
+
+    Returns:
+        list: dicts with name, size and created keys
+    """
+    try:
+        entries = [e for e in os.scandir(PROFILE_DIR) if e.name.endswith('.prof')]
+    except FileNotFoundError:
+        return []
+
+    profiles = []
+    for entry in entries:
+        stat = entry.stat()
+        profiles.append({
+            'name': entry.name[:-len('.prof')],
+            'size': stat.st_size,
+            'created': datetime.datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M:%S'),
+        })
+    return sorted(profiles, key=lambda p: p['name'], reverse=True)
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor that logs statements whose execute plus fetch time is slow."""
+
+    _sql = None
+    _elapsed = 0.0
+    _reported = False
+
+    def _observe(self, start):
+        self._elapsed += time.perf_counter() - start
+        if not self._reported and self._elapsed * 1000 >= SLOW_QUERY_MS:
+            self._reported = True
+            logger.warning(f"Slow SQL ({self._elapsed * 1000:.1f} ms): {' '.join(str(self._sql).split())}")
+
+    def execute(self, sql, parameters=()):
+        self._sql, self._elapsed, self._reported = sql, 0.0, False
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._observe(start)
+
+    def fetchone(self):
+        start = time.perf_counter()
+        try:
+            return super().fetchone()
+        finally:
+            self._observe(start)
+
+    def fetchall(self):
+        start = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            self._observe(start)
+
+class TimedConnection(sqlite3.Connection):
+    """Connection whose cursors, including the ones behind execute(), are timed."""
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        # The C implementation of execute() bypasses cursor()
+        return self.cursor().execute(sql, parameters)
+
+def connect(db_path, **kwargs):
+    """Open a SQLite connection, with slow-statement logging unless disabled."""
+    if SLOW_QUERY_MS > 0:
+        return sqlite3.connect(db_path, factory=TimedConnection, **kwargs)
+    return sqlite3.connect(db_path, **kwargs)
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+
+import os
+import re
+import sqlite3
+import logging
+import datetime
+
+# Set up logging
+logger = logging.getLogger('acea_release_calendar')
+
+# Constants
+DB_PATH = '/app/data/database.db'
+FILES_BASE_URL = 'https://www.acea.auto/files/'
+
+# Release windows in days after the end of the reporting period, used until
+# enough history has been collected to learn them
+DEFAULT_WINDOWS = {'PC': (15, 30), 'CV': (15, 40)}
+MIN_SAMPLES = 3
+WINDOW_MARGIN_DAYS = 2
+# Reports found later than this after their period ended were not picked up
+# at release (e.g. by the very first scan), so they say nothing about timing
+MAX_RELEASE_LAG_DAYS = 60
+
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June',
+          'July', 'August', 'September', 'October', 'November', 'December']
+CV_QUARTERS = {'Q1': 4, 'Q1-Q2': 7, 'Q1-Q3': 10}  # period label -> month the period ends
+
+def _month_start(year, month):
+    """First instant of a month, rolling over into the next year."""
+    return datetime.datetime(year + (month - 1) // 12, (month - 1) % 12 + 1, 1)
+
+def period_end(filename):
+    """
+    Work out when the reporting period of a report file ended.
+
+    Returns:
+        datetime: Start of the day after the period, or None if the filename
+        doesn't follow a known pattern
+    """
+    name = os.path.basename(filename).replace('.pdf', '').replace('_rev', '')
+
+    match = re.search(r'_(' + '|'.join(MONTHS) + r')_(\d{4})$', name)
+    if match:
+        return _month_start(int(match.group(2)), MONTHS.index(match.group(1)) + 2)
+
+    match = re.search(r'_first_half_(\d{4})$', name)
+    if match:
+        return _month_start(int(match.group(1)), 7)
+
+    match = re.search(r'_(Q1|Q1-Q2|Q1-Q3)_(\d{4})$', name)
+    if match:
+        return _month_start(int(match.group(2)), CV_QUARTERS[match.group(1)])
+
+    match = re.search(r'_registrations_(\d{4})$', name)
+    if match:
+        return _month_start(int(match.group(1)) + 1, 1)
+
+    return None
+
+def learn_window(conn, report_type):
+    """
+    Learn the release window of a report type from when reports were found.
+
+    The created_at timestamp of each report is compared with the end of the
+    period it covers; the window spans the observed lags plus a margin.
+
+    Returns:
+        tuple: (first_day, last_day) after the end of a period
+    """
+    lags = []
+    rows = conn.execute(
+        'SELECT pdf_url, created_at FROM reports WHERE type = ?', (report_type,)
+    ).fetchall()
+    for pdf_url, created_at in rows:
+        end = period_end(pdf_url or '')
+        if end is None:
+            continue
+        try:
+            found = datetime.datetime.strptime(created_at, '%Y-%m-%d %H:%M:%S')
+        except (TypeError, ValueError):
+            continue
+        lag = (found - end).total_seconds() / 86400
+        if 0 <= lag <= MAX_RELEASE_LAG_DAYS:
+            lags.append(lag)
+
+    if len(lags) < MIN_SAMPLES:
+        return DEFAULT_WINDOWS[report_type]
+
+    return (max(0, min(lags) - WINDOW_MARGIN_DAYS), max(lags) + WINDOW_MARGIN_DAYS)
+
+def expected_reports(report_type, now, window):
+    """
+    Filenames (without .pdf) of the reports due now, if now falls inside
+    their release window.
+
+    Returns:
+        list: Report names, empty outside the window
+    """
+    if report_type == 'PC':
+        end = _month_start(now.year, now.month)
+        # Try the previous period too, in case the window straddles a boundary
+        candidates = [end, _month_start(now.year, now.month - 1)]
+    else:
+        quarter_month = (now.month - 1) // 3 * 3 + 1
+        end = _month_start(now.year, quarter_month)
+        candidates = [end, _month_start(now.year, quarter_month - 3)]
+
+    for end in candidates:
+        lag = (now - end).total_seconds() / 86400
+        if window[0] <= lag <= window[1]:
+            break
+    else:
+        return []
+
+    # The period that finished at `end`
+    last = end - datetime.timedelta(days=1)
+    if report_type == 'PC':
+        names = [f"Press_release_car_registrations_{MONTHS[last.month - 1]}_{last.year}"]
+        if last.month == 6:
+            names.append(f"Press_release_car_registrations_first_half_{last.year}")
+        if last.month == 12:
+            names.append(f"Press_release_car_registrations_{last.year}")
+    else:
+        labels = {3: f"Q1_{last.year}", 6: f"Q1-Q2_{last.year}", 9: f"Q1-Q3_{last.year}", 12: f"{last.year}"}
+        names = [f"Press_release_commercial_vehicle_registrations_{labels[last.month]}"]
+
+    return names
+
+def is_released(conn, name):
+    """Check whether either the original or the _rev version of a report is stored."""
+    row = conn.execute(
+        'SELECT 1 FROM reports WHERE pdf_url IN (?, ?) LIMIT 1',
+        (f"{FILES_BASE_URL}{name}.pdf", f"{FILES_BASE_URL}{name}_rev.pdf")
+    ).fetchone()
+    return row is not None
+
+def due_urls(now=None):
+    """
+    Candidate URLs for every report type currently inside its release window.
+
+    Reports already found in this window are left out, so probing stops as
+    soon as the release has been picked up.
+
+    Returns:
+        dict: report type -> list of URLs
+    """
+    now = now or datetime.datetime.now()
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        due = {}
+        for report_type in ('PC', 'CV'):
+            window = learn_window(conn, report_type)
+            urls = []
+            for name in expected_reports(report_type, now, window):
+                if not is_released(conn, name):
+                    urls.append(f"{FILES_BASE_URL}{name}.pdf")
+                    urls.append(f"{FILES_BASE_URL}{name}_rev.pdf")
+            if urls:
+                logger.info(f"{report_type} release window {window[0]:.1f}-{window[1]:.1f} days is open")
+                due[report_type] = urls
+        return due
+    finally:
+        conn.close()
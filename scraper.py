@@ -6,10 +6,22 @@ import logging
 import requests
 import datetime
 import time
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
+from bs4 import BeautifulSoup, SoupStrainer
+from urllib.parse import urljoin, urlparse
 import sqlite3
 from dateutil import parser
+from database import init_database
+import data_version
+import metrics
+import profiling
+import search_index
+
+# lxml is much faster than html.parser; fall back if it isn't installed
+try:
+    import lxml
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
 
 # Set up logging
 logging.basicConfig(
@@ -25,33 +37,29 @@ PRESS_RELEASES_URL = 'https://www.acea.auto/nav/?content=press-releases'
 DB_PATH = '/app/data/database.db'
 PDF_DIR = '/app/data/pdfs'
 FILES_BASE_URL = 'https://www.acea.auto/files/'
+REQUEST_DELAY = 1  # seconds between probes, to avoid being blocked
+# 'listing' discovers reports from the press-release listing and only guesses
+# filenames if the listing can't be fetched or has no registration links;
+# 'guess' and 'both' as named
+SCAN_MODE = os.environ.get('SCAN_MODE', 'listing')
+DISCOVERY_MAX_PAGES = 10
+
+# Only anchors (and <link rel="next">) are parsed from listing and article pages
+LINK_STRAINER = SoupStrainer(['a', 'link'], href=True)
+PDF_LINK_STRAINER = SoupStrainer('a', href=re.compile(r'\.pdf($|\?)', re.I))
+REGISTRATIONS_PATTERN = re.compile(r'registrations', re.I)
 
 # Ensure directories exist
 os.makedirs(PDF_DIR, exist_ok=True)
 os.makedirs('/app/logs/debug', exist_ok=True)
 
-def init_database():
-    """Initialize the SQLite database if it doesn't exist."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS reports (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        type TEXT NOT NULL,
-        title TEXT NOT NULL,
-        url TEXT NOT NULL,
-        pdf_url TEXT,
-        pdf_path TEXT,
-        publish_date TEXT,
-        created_at TEXT NOT NULL
-    )
-    ''')
-    conn.commit()
-    conn.close()
-    logger.info("Database initialized")
-
-def fetch_page(url, retries=3):
-    """Fetch a webpage using exact curl parameters that work."""
+def fetch_page(url, retries=3, parse_only=None):
+    """
+    Fetch a webpage using exact curl parameters that work.
+    
+    parse_only takes a SoupStrainer so that only the matching nodes are
+    parsed, instead of building the tree for the whole page.
+    """
     # Create a session to maintain cookies
     session = requests.Session()
     
@@ -98,14 +106,19 @@ def fetch_page(url, retries=3):
             # Log successful response info
             logger.info(f"Successfully fetched {url} - Status code: {response.status_code}")
             
-            return BeautifulSoup(response.content, 'html.parser')
+            return BeautifulSoup(response.content, HTML_PARSER, parse_only=parse_only)
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching {url} (attempt {attempt+1}/{retries}): {e}")
             if attempt == retries - 1:
                 return None
 
-def download_pdf(pdf_url, filename):
-    """Download a PDF file using exact curl parameters that work."""
+def download_pdf(pdf_url, filename, raise_errors=False):
+    """
+    Download a PDF file using exact curl parameters that work.
+    
+    Missing files always return None; with raise_errors, network and server
+    errors are raised instead so the caller can tell them apart and retry.
+    """
     session = requests.Session()
     
     # Headers from the successful curl command
@@ -138,7 +151,13 @@ def download_pdf(pdf_url, filename):
     
     try:
         logger.info(f"Downloading PDF: {pdf_url}")
-        response = session.get(pdf_url, headers=headers, cookies=cookies, timeout=30)
+        start = time.perf_counter()
+        try:
+            response = session.get(pdf_url, headers=headers, cookies=cookies, timeout=30)
+        except requests.exceptions.RequestException:
+            metrics.PROBE_DURATION.labels(status='error').observe(time.perf_counter() - start)
+            raise
+        metrics.PROBE_DURATION.labels(status=response.status_code).observe(time.perf_counter() - start)
         
         # Check if we got a successful response
         if response.status_code == 404:
@@ -161,6 +180,8 @@ def download_pdf(pdf_url, filename):
         return pdf_path
     except requests.exceptions.RequestException as e:
         logger.error(f"Error downloading PDF {pdf_url}: {e}")
+        if raise_errors:
+            raise
         return None
 
 def extract_date(date_text):
@@ -188,16 +209,31 @@ def is_report_processed(url, filename=None):
     return result is not None
 
 def save_report(report_type, title, url, pdf_url, pdf_path, publish_date):
-    """Save report information to the database."""
+    """
+    Save report information to the database and add it to the search index.
+    
+    Returns:
+        bool: False if another process recorded the same PDF first
+    """
+    body = search_index.extract_text(pdf_path)
+    
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO reports (type, title, url, pdf_url, pdf_path, publish_date, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
-        (report_type, title, url, pdf_url, pdf_path, publish_date, datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
-    )
+    try:
+        cursor.execute(
+            "INSERT INTO reports (type, title, url, pdf_url, pdf_path, publish_date, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (report_type, title, url, pdf_url, pdf_path, publish_date, datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        )
+    except sqlite3.IntegrityError:
+        conn.close()
+        logger.info(f"Report already saved: {pdf_url}")
+        return False
+    search_index.index_report(conn, cursor.lastrowid, title, body)
+    data_version.bump(conn)
     conn.commit()
     conn.close()
     logger.info(f"Saved report: {title}")
+    return True
 
 def generate_pc_urls():
     """Generate URLs for PC (passenger car) reports."""
@@ -278,87 +314,220 @@ def generate_cv_urls():
     
     return urls
 
-def download_direct_pdfs():
-    """Try to download all possible PDF files directly."""
-    # Get all URLs
-    pc_urls = generate_pc_urls()
-    cv_urls = generate_cv_urls()
+def parse_pc_publish_date(filename):
+    """Get the report month from a PC filename such as ..._January_2025_rev.pdf."""
+    try:
+        parts = filename.replace('.pdf', '').replace('_rev', '').split('_')
+        month_year = parts[-2] + ' ' + parts[-1]
+        date = datetime.datetime.strptime(month_year, '%B %Y')
+        return date.strftime('%Y-%m-%d')
+    except:
+        return datetime.datetime.now().strftime('%Y-%m-%d')
+
+def describe_report(report_type, filename):
+    """
+    Build the title and publish date stored for a report PDF.
     
-    logger.info(f"Generated {len(pc_urls)} PC URLs and {len(cv_urls)} CV URLs to try")
+    Returns:
+        tuple: (title, publish_date)
+    """
+    # Generate a title from the filename
+    title = f"{report_type} Report - {filename.replace('.pdf', '').replace('_', ' ')}"
+    
+    if report_type == 'PC':
+        # Try to extract month and year from the filename
+        publish_date = parse_pc_publish_date(filename)
+    else:
+        publish_date = datetime.datetime.now().strftime('%Y-%m-%d')
+    
+    return title, publish_date
+
+def process_report_url(report_type, url, source_url=None):
+    """
+    Download a candidate report URL and record it in the database.
+    
+    source_url is the press release page the PDF was linked from, if known.
     
-    # Download PC reports
-    pc_count = 0
-    for url in pc_urls:
+    Returns:
+        bool: True if a new report was saved
+    """
+    # Extract filename from URL
+    filename = os.path.basename(url)
+    
+    # Try to download
+    pdf_path = download_pdf(url, filename)
+    if not pdf_path:
+        return False
+    
+    title, publish_date = describe_report(report_type, filename)
+    
+    # Without a press release page, use the URL as both source URL and PDF URL
+    return save_report(report_type, title, source_url or url, url, pdf_path, publish_date)
+
+def probe_report_urls(report_type, urls):
+    """
+    Try each candidate URL that hasn't been processed yet.
+    
+    Returns:
+        int: Number of new reports downloaded
+    """
+    count = 0
+    for url in urls:
         # Extract filename from URL
         filename = os.path.basename(url)
         
         # Check if already processed by URL or filename
         if is_report_processed(url, filename):
-            logger.info(f"Already processed PC PDF: {url} or {filename}")
+            logger.info(f"Already processed {report_type} PDF: {url} or {filename}")
             continue
         
-        # Try to download
-        pdf_path = download_pdf(url, filename)
-        if pdf_path:
-            # Generate a title from the filename
-            title = f"PC Report - {filename.replace('.pdf', '').replace('_', ' ')}"
-            
-            # Try to extract month and year from the filename
-            try:
-                parts = filename.split('_')
-                month_year = parts[-2] + ' ' + parts[-1].replace('.pdf', '').replace('rev', '')
-                date = datetime.datetime.strptime(month_year, '%B %Y')
-                publish_date = date.strftime('%Y-%m-%d')
-            except:
-                publish_date = datetime.datetime.now().strftime('%Y-%m-%d')
-            
-            # Use URL as both source URL and PDF URL for simplicity
-            save_report('PC', title, url, url, pdf_path, publish_date)
-            pc_count += 1
+        if process_report_url(report_type, url):
+            count += 1
         
         # Add a small delay to avoid being blocked
-        time.sleep(1)
+        time.sleep(REQUEST_DELAY)
     
-    # Download CV reports
-    cv_count = 0
-    for url in cv_urls:
-        # Extract filename from URL
-        filename = os.path.basename(url)
+    return count
+
+def download_direct_pdfs():
+    """Try to download all possible PDF files directly."""
+    # Get all URLs
+    pc_urls = generate_pc_urls()
+    cv_urls = generate_cv_urls()
+    
+    logger.info(f"Generated {len(pc_urls)} PC URLs and {len(cv_urls)} CV URLs to try")
+    
+    pc_count = probe_report_urls('PC', pc_urls)
+    cv_count = probe_report_urls('CV', cv_urls)
+    
+    logger.info(f"Successfully downloaded {pc_count} PC PDFs and {cv_count} CV PDFs")
+    return pc_count + cv_count
+
+def report_type_for(url):
+    """Classify a press release or PDF URL as a PC or CV registrations report."""
+    if not REGISTRATIONS_PATTERN.search(url):
+        return None
+    lowered = url.lower()
+    if 'commercial' in lowered:
+        return 'CV'
+    if 'car' in lowered:
+        return 'PC'
+    return None
+
+def parse_listing(soup, page_url):
+    """
+    Extract registration report links and the next page from a listing page.
+    
+    Returns:
+        tuple: (list of report links in page order, next page URL or None)
+    """
+    links = []
+    next_url = None
+    for node in soup.find_all(['a', 'link'], href=True):
+        href = urljoin(page_url, node['href'])
+        markers = (node.get('rel') or []) + (node.get('class') or [])
+        if any('next' in marker.lower() for marker in markers):
+            next_url = next_url or href
+        elif node.name == 'a' and report_type_for(href) and href not in links:
+            links.append(href)
+    return links, next_url
+
+def find_pdf_links(page_url):
+    """
+    Return the PDFs attached to a registrations press release page.
+    
+    The press release link already tells which report it is, so the PDFs
+    are kept whatever their filename, as long as they are ACEA's own files.
+    """
+    soup = fetch_page(page_url, parse_only=PDF_LINK_STRAINER)
+    if soup is None:
+        return []
+    
+    host = urlparse(page_url).netloc
+    pdf_urls = []
+    for anchor in soup.find_all('a', href=True):
+        pdf_url = urljoin(page_url, anchor['href'])
+        parsed = urlparse(pdf_url)
+        if (parsed.netloc == host or '/files/' in parsed.path) and pdf_url not in pdf_urls:
+            pdf_urls.append(pdf_url)
+    return pdf_urls
+
+def discover_from_listing():
+    """
+    Find new reports through the press release listing.
+    
+    Pages are walked newest first until one contains a press release that is
+    already in the database, so a routine scan costs a single listing fetch.
+    
+    Returns:
+        int: Number of new reports downloaded, or None if the listing
+        couldn't be fetched or its first page has no registration links,
+        e.g. because the markup changed
+    """
+    page_url = PRESS_RELEASES_URL
+    visited = set()
+    count = 0
+    
+    for page in range(DISCOVERY_MAX_PAGES):
+        soup = fetch_page(page_url, parse_only=LINK_STRAINER)
+        if soup is None:
+            return None if page == 0 else count
+        visited.add(page_url)
         
-        # Check if already processed by URL or filename
-        if is_report_processed(url, filename):
-            logger.info(f"Already processed CV PDF: {url} or {filename}")
-            continue
+        links, next_url = parse_listing(soup, page_url)
+        logger.info(f"Found {len(links)} registration press releases on {page_url}")
+        if page == 0 and not links:
+            return None
         
-        # Try to download
-        pdf_path = download_pdf(url, filename)
-        if pdf_path:
-            # Generate a title from the filename
-            title = f"CV Report - {filename.replace('.pdf', '').replace('_', ' ')}"
-            publish_date = datetime.datetime.now().strftime('%Y-%m-%d')
+        reached_known = False
+        for link in links:
+            if is_report_processed(link):
+                reached_known = True
+                continue
             
-            # Use URL as both source URL and PDF URL for simplicity
-            save_report('CV', title, url, url, pdf_path, publish_date)
-            cv_count += 1
+            pdf_urls = [link] if link.lower().split('?')[0].endswith('.pdf') else find_pdf_links(link)
+            for pdf_url in pdf_urls:
+                filename = os.path.basename(pdf_url)
+                if is_report_processed(pdf_url, filename):
+                    reached_known = True
+                    continue
+                if process_report_url(report_type_for(filename) or report_type_for(link), pdf_url, link):
+                    count += 1
+                time.sleep(REQUEST_DELAY)
         
-        # Add a small delay to avoid being blocked
-        time.sleep(1)
+        if reached_known or not next_url or next_url in visited:
+            break
+        page_url = next_url
     
-    logger.info(f"Successfully downloaded {pc_count} PC PDFs and {cv_count} CV PDFs")
-    return pc_count + cv_count
+    return count
 
 def scan_for_new_reports():
-    """Scan for new reports using the direct PDF approach."""
+    """Scan for new reports via the press release listing and/or filename guessing."""
     logger.info("Starting scan for new ACEA reports")
-    total_downloaded = download_direct_pdfs()
+    total_downloaded = 0
+    
+    listing_count = None
+    if SCAN_MODE in ('listing', 'both'):
+        listing_count = discover_from_listing()
+        if listing_count is None:
+            logger.warning("No registration links found in the press release listing, falling back to guessing report URLs")
+        else:
+            total_downloaded += listing_count
+    
+    if SCAN_MODE in ('guess', 'both') or listing_count is None:
+        total_downloaded += download_direct_pdfs()
+    
     logger.info(f"Finished scanning for ACEA reports - Downloaded {total_downloaded} new PDFs")
 
 def main():
     """Main function to initialize the database and scan for new reports."""
     logger.info("Starting ACEA report scraper")
-    init_database()
-    scan_for_new_reports()
+    with profiling.profile('scan', profiling.enabled('scan')):
+        init_database()
+        scan_for_new_reports()
     logger.info("Finished scanning for ACEA reports")
+    # The dashboard shows the time of the last scan even when nothing was found
+    data_version.bump()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+
+import io
+import re
+import html
+import sqlite3
+import logging
+import archive
+
+# Set up logging
+logger = logging.getLogger('acea_search')
+
+# Constants
+DB_PATH = '/app/data/database.db'
+SEARCH_LIMIT = 50
+SNIPPET_TOKENS = 16
+# Title matches rank above matches in the body text
+TITLE_WEIGHT = 5.0
+BODY_WEIGHT = 1.0
+# Control characters that can't occur in extracted text, swapped for <mark>
+# tags once the snippet has been HTML-escaped
+_MARK_START, _MARK_END = '\x02', '\x03'
+
+def create_index(conn):
+    """
+    Create the full-text index of report titles and PDF text.
+
+    The rowid of each entry is the id of its report.
+    """
+    try:
+        conn.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS report_search USING fts5(
+            title, body, tokenize = 'unicode61 remove_diacritics 2'
+        )
+        ''')
+    except sqlite3.OperationalError as e:
+        logger.error(f"Full-text search unavailable, SQLite was built without FTS5: {e}")
+
+def extract_text(pdf_path):
+    """
+    Extract the text of a PDF for indexing.
+
+    Returns:
+        str: The text of all pages, or an empty string if it can't be read
+    """
+    try:
+        # Imported here so the web app doesn't load it just to search
+        from pypdf import PdfReader
+    except ImportError:
+        logger.warning("pypdf is not installed, indexing report titles only")
+        return ''
+
+    try:
+        # Reports indexed late may already have been moved to the archive
+        data = archive.read(pdf_path)
+        if data is None:
+            logger.warning(f"PDF not found for indexing: {pdf_path}")
+            return ''
+        reader = PdfReader(io.BytesIO(data))
+        return '\n'.join(page.extract_text() or '' for page in reader.pages)
+    except Exception as e:
+        logger.error(f"Error extracting text from {pdf_path}: {e}")
+        return ''
+
+def index_report(conn, report_id, title, body):
+    """Add or replace the index entry of a report. The caller commits."""
+    try:
+        conn.execute(
+            'INSERT OR REPLACE INTO report_search (rowid, title, body) VALUES (?, ?, ?)',
+            (report_id, title, body)
+        )
+    except sqlite3.Error as e:
+        logger.error(f"Error indexing report {report_id}: {e}")
+
+def index_reports_by_pdf_url(conn, entries):
+    """
+    Index a batch of reports that were just inserted, before their ids are known.
+
+    entries holds (body, pdf_url) pairs. The caller commits.
+    """
+    try:
+        conn.executemany(
+            'INSERT OR REPLACE INTO report_search (rowid, title, body) '
+            'SELECT id, title, ? FROM reports WHERE pdf_url = ?',
+            entries
+        )
+    except sqlite3.Error as e:
+        logger.error(f"Error indexing {len(entries)} reports: {e}")
+
+def remove_reports(conn, report_ids):
+    """Drop the index entries of deleted reports. The caller commits."""
+    placeholders = ','.join(['?'] * len(report_ids))
+    try:
+        conn.execute(f'DELETE FROM report_search WHERE rowid IN ({placeholders})', report_ids)
+    except sqlite3.Error as e:
+        logger.error(f"Error removing reports from the search index: {e}")
+
+def index_missing():
+    """
+    Index the reports that have no entry yet, such as those stored before
+    the index existed.
+
+    Returns:
+        int: Number of reports indexed
+    """
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        rows = conn.execute(
+            'SELECT id, title, pdf_path FROM reports WHERE id NOT IN (SELECT rowid FROM report_search)'
+        ).fetchall()
+    except sqlite3.Error as e:
+        logger.error(f"Error finding unindexed reports: {e}")
+        conn.close()
+        return 0
+
+    for report_id, title, pdf_path in rows:
+        # Extract outside any transaction so writers aren't held up
+        body = extract_text(pdf_path) if pdf_path else ''
+        index_report(conn, report_id, title, body)
+        conn.commit()
+
+    conn.close()
+    if rows:
+        logger.info(f"Indexed {len(rows)} reports for search")
+    return len(rows)
+
+def match_expression(query):
+    """
+    Turn free text into an FTS5 query matching all of its words.
+
+    Every word is quoted so punctuation and FTS5 operators in the input are
+    taken literally; the last word also matches as a prefix.
+
+    Returns:
+        str: The MATCH expression, or None if the query has no words
+    """
+    words = re.findall(r'\w+', query)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+def highlight(snippet):
+    """HTML-escape a snippet and wrap the matched terms in <mark> tags."""
+    escaped = html.escape(snippet or '')
+    return escaped.replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+
+def search(conn, query, limit=SEARCH_LIMIT):
+    """
+    Find the reports matching a query, best match first.
+
+    Returns:
+        list: dicts with the report fields and an HTML snippet of the match
+    """
+    expression = match_expression(query)
+    if expression is None:
+        return []
+
+    try:
+        rows = conn.execute(f'''
+            SELECT r.id, r.type, r.title, r.publish_date, r.pdf_path, r.excel_path, r.conversion_status,
+                   snippet(report_search, -1, '{_MARK_START}', '{_MARK_END}', '…', {SNIPPET_TOKENS}) AS snippet
+            FROM report_search
+            JOIN reports r ON r.id = report_search.rowid
+            WHERE report_search MATCH ?
+            ORDER BY bm25(report_search, {TITLE_WEIGHT}, {BODY_WEIGHT})
+            LIMIT ?
+        ''', (expression, limit)).fetchall()
+    except sqlite3.Error as e:
+        logger.error(f"Error searching for {query!r}: {e}")
+        return []
+
+    results = []
+    for row in rows:
+        report_id, report_type, title, publish_date, pdf_path, excel_path, conversion_status, snippet = row
+        results.append({
+            'id': report_id,
+            'type': report_type,
+            'title': title,
+            'publish_date': publish_date,
+            'pdf_path': pdf_path,
+            'excel_path': excel_path,
+            'conversion_status': conversion_status,
+            'snippet': highlight(snippet),
+        })
+    return results
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+import sqlite3
+import logging
+import datetime
+
+# Set up logging
+logger = logging.getLogger('acea_tasks')
+
+# Constants
+DB_PATH = '/app/data/database.db'
+TASK_NAMES = ('scan', 'convert_all')
+
+def request_task(name):
+    """
+    Ask the scheduler process to run a task as soon as possible.
+
+    A request that is already waiting to be picked up is reused rather than
+    queued twice.
+
+    Returns:
+        int: ID of the pending task request
+    """
+    if name not in TASK_NAMES:
+        raise ValueError(f"Unknown task: {name}")
+
+    conn = sqlite3.connect(DB_PATH)
+    with conn:
+        conn.execute('BEGIN IMMEDIATE')
+        row = conn.execute(
+            "SELECT id FROM tasks WHERE name = ? AND status = 'pending'", (name,)
+        ).fetchone()
+        if row:
+            task_id = row[0]
+        else:
+            task_id = conn.execute(
+                "INSERT INTO tasks (name, status, requested_at) VALUES (?, 'pending', ?)",
+                (name, datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+            ).lastrowid
+            logger.info(f"Queued task {name} ({task_id})")
+    conn.close()
+    return task_id
+
+def claim_pending_tasks():
+    """
+    Mark all pending task requests as running and return them.
+
+    Returns:
+        list: (id, name) tuples in request order
+    """
+    now = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    conn = sqlite3.connect(DB_PATH)
+    with conn:
+        conn.execute('BEGIN IMMEDIATE')
+        tasks = conn.execute(
+            "SELECT id, name FROM tasks WHERE status = 'pending' ORDER BY id"
+        ).fetchall()
+        conn.executemany(
+            "UPDATE tasks SET status = 'running', started_at = ? WHERE id = ?",
+            [(now, task_id) for task_id, _ in tasks]
+        )
+    conn.close()
+    return tasks
+
+def finish_task(task_id, success, message=None):
+    """Record the outcome of a task request."""
+    conn = sqlite3.connect(DB_PATH)
+    conn.execute(
+        'UPDATE tasks SET status = ?, finished_at = ?, message = ? WHERE id = ?',
+        ('done' if success else 'failed', datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'), message, task_id)
+    )
+    conn.commit()
+    conn.close()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+
+import sys
+import datetime
+import logging
+import threading
+
+# Set up logging before the app modules are imported: scraper.py calls
+# basicConfig at import time and the first configuration wins
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+logging.basicConfig(
+    level=logging.INFO,
+    format=LOG_FORMAT,
+    handlers=[logging.FileHandler('/app/logs/worker.log'), logging.StreamHandler(sys.stdout)]
+)
+# Scans still write scraper.log, which /logs and the dashboard's last scan time read
+scraper_log_handler = logging.FileHandler('/app/logs/scraper.log')
+scraper_log_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+logging.getLogger('acea_scraper').addHandler(scraper_log_handler)
+# Otherwise every 15-second task poll logs two lines
+logging.getLogger('apscheduler').setLevel(logging.WARNING)
+
+from apscheduler.schedulers.blocking import BlockingScheduler
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+import scraper
+import archive
+import converter
+import file_reaper
+import release_calendar
+import search_index
+import tasks
+
+logger = logging.getLogger('acea_worker')
+
+# Constants
+JOBS_DB_URL = 'sqlite:////app/data/jobs.db'
+# Full scans back off to daily; inside a release window the expected reports
+# are probed every few minutes instead
+SCAN_INTERVAL_HOURS = 24
+RELEASE_PROBE_MINUTES = 10
+TASK_POLL_SECONDS = 15
+CONVERSION_RETRY_SECONDS = 60
+ORPHAN_SWEEP_HOURS = 24
+SEARCH_INDEX_HOURS = 1
+ARCHIVE_HOURS = 24
+# Interval jobs are anchored here so restarting the process keeps the same
+# run times instead of pushing the next scan a full interval into the future
+SCHEDULE_ANCHOR = '2024-01-01 00:00:00'
+
+# Scans and release probes run in the scheduler's thread pool and fire
+# together at the anchor; only one of them may download and save at a time
+scraper_lock = threading.Lock()
+
+def run_scan():
+    """Run the scraper."""
+    logger.info("Running scheduled scraper job")
+    try:
+        with scraper_lock:
+            scraper.main()
+    except Exception as e:
+        logger.error(f"Error in scheduled scraper job: {e}")
+
+def run_release_probe():
+    """Probe only the reports whose release window is open right now."""
+    # A running scan already covers the due reports
+    if not scraper_lock.acquire(blocking=False):
+        logger.info("Skipping release probe while a scan is running")
+        return
+    try:
+        for report_type, urls in release_calendar.due_urls().items():
+            found = scraper.probe_report_urls(report_type, urls)
+            logger.info(f"Release probe found {found} new {report_type} reports")
+    except Exception as e:
+        logger.error(f"Error in release probe: {e}")
+    finally:
+        scraper_lock.release()
+
+def run_conversion_retries():
+    """Retry the conversions waiting in the queue once they are due."""
+    try:
+        converter.drain_queue()
+    except Exception as e:
+        logger.error(f"Error retrying queued conversions: {e}")
+
+def run_orphan_sweep():
+    """Remove data files no report refers to."""
+    try:
+        removed = file_reaper.sweep_orphans()
+        logger.info(f"Orphan sweep removed {removed} files")
+    except Exception as e:
+        logger.error(f"Error in orphan sweep: {e}")
+
+def run_archive():
+    """Compress report files that haven't been used for a long time."""
+    try:
+        archive.archive_old_files()
+    except Exception as e:
+        logger.error(f"Error archiving old files: {e}")
+
+def run_search_indexing():
+    """Index the reports the search index doesn't cover yet."""
+    try:
+        search_index.index_missing()
+    except Exception as e:
+        logger.error(f"Error indexing reports for search: {e}")
+
+def process_task_requests():
+    """Run the scans and conversions requested from the web app."""
+    for task_id, name in tasks.claim_pending_tasks():
+        logger.info(f"Running requested task {name} ({task_id})")
+        try:
+            if name == 'scan':
+                with scraper_lock:
+                    scraper.main()
+                tasks.finish_task(task_id, True, 'Scan completed successfully')
+            elif name == 'convert_all':
+                success_count, fail_count = converter.convert_pending()
+                tasks.finish_task(task_id, True, f'Converted {success_count} PDFs to Excel, {fail_count} failed')
+        except Exception as e:
+            logger.error(f"Error in requested task {name} ({task_id}): {e}")
+            tasks.finish_task(task_id, False, str(e))
+
+def create_scheduler():
+    """Create the scheduler with its persistent job store and recurring jobs."""
+    scheduler = BlockingScheduler(
+        jobstores={'default': SQLAlchemyJobStore(url=JOBS_DB_URL)},
+        job_defaults={'coalesce': True, 'max_instances': 1, 'misfire_grace_time': 3600}
+    )
+
+    # Re-adding the stored jobs on start picks up changed intervals
+    scheduler.add_job(run_scan, 'interval', hours=SCAN_INTERVAL_HOURS,
+                      start_date=SCHEDULE_ANCHOR, id='scan', replace_existing=True)
+    scheduler.add_job(run_release_probe, 'interval', minutes=RELEASE_PROBE_MINUTES,
+                      start_date=SCHEDULE_ANCHOR, id='release_probe', replace_existing=True)
+    scheduler.add_job(process_task_requests, 'interval', seconds=TASK_POLL_SECONDS,
+                      start_date=SCHEDULE_ANCHOR, id='task_requests', replace_existing=True)
+    scheduler.add_job(run_conversion_retries, 'interval', seconds=CONVERSION_RETRY_SECONDS,
+                      start_date=SCHEDULE_ANCHOR, id='conversion_retries', replace_existing=True)
+    scheduler.add_job(run_orphan_sweep, 'interval', hours=ORPHAN_SWEEP_HOURS,
+                      start_date=SCHEDULE_ANCHOR, id='orphan_sweep', replace_existing=True)
+    scheduler.add_job(run_archive, 'interval', hours=ARCHIVE_HOURS,
+                      start_date=SCHEDULE_ANCHOR, id='archive', replace_existing=True)
+    # Also runs right away so an existing archive is indexed after upgrading
+    scheduler.add_job(run_search_indexing, 'interval', hours=SEARCH_INDEX_HOURS,
+                      next_run_time=datetime.datetime.now(), id='search_index', replace_existing=True)
+
+    return scheduler
+
+def main():
+    """Initialize the database and run the scheduler until interrupted."""
+    logger.info("Starting ACEA scheduler process")
+    scraper.init_database()
+
+    scheduler = create_scheduler()
+    try:
+        scheduler.start()
+    except (KeyboardInterrupt, SystemExit):
+        logger.info("Scheduler process stopped")
+
+if __name__ == "__main__":
+    main()